@@ -0,0 +1,83 @@
+# Benchmark: choropleth payload per state.
+#
+# For every state (and the whole US), the county boundaries the choropleth
+# map ships: the pre-simplified, quantized TopoJSON of the level chosen for
+# the map's zoom, against the same counties at the finest level, and against
+# the chosen level decoded to plain GeoJSON (every shared border twice,
+# coordinates as 5-decimal floats). Also the built map HTML and its build time.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_choropleth.py
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import county_shapes  # noqa: E402
+import map_cache  # noqa: E402
+from datasets import get_dataset  # noqa: E402
+from gazetteer import attach_centroids, fips_codes  # noqa: E402
+from state_index import get_state_index  # noqa: E402
+
+
+def to_geojson(topology):
+    scale, translate = topology["transform"]["scale"], topology["transform"]["translate"]
+    arcs = [np.round(np.cumsum(np.asarray(arc), axis=0) * scale + translate, 5) for arc in topology["arcs"]]
+
+    def ring(references):
+        points = []
+        for reference in references:
+            arc = arcs[reference] if reference >= 0 else arcs[~reference][::-1]
+            points.extend(arc.tolist() if not points else arc[1:].tolist())
+        return points
+
+    features = []
+    for geometry in topology["objects"]["counties"]["geometries"]:
+        if geometry["type"] == "Polygon":
+            coordinates = [ring(references) for references in geometry["arcs"]]
+        else:
+            coordinates = [[ring(references) for references in polygon] for polygon in geometry["arcs"]]
+        features.append({"type": "Feature", "id": geometry["id"], "properties": geometry["properties"],
+                          "geometry": {"type": geometry["type"], "coordinates": coordinates}})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def kb(data):
+    payload = json.dumps(data, separators=(",", ":")).encode()
+    return len(payload) / 1024, len(gzip.compress(payload)) / 1024
+
+
+if __name__ == "__main__":
+    views = [(state, entry.rows) for state, entry in sorted(get_state_index().items())]
+    views.append((map_cache.NATIONAL, get_dataset("locations")))
+    options = {"markers": False, "heatmap": False, "choropleth": map_cache.SALARY_COL}
+
+    print(f"{'map':<4} {'counties':>8} {'zoom':>4} {'TopoJSON KB':>12} {'finest KB':>10} {'GeoJSON KB':>11} "
+          f"{'HTML KB':>8} {'gzip KB':>8} {'build s':>8}")
+    rows = []
+    for state, state_rows in views:
+        located_df = attach_centroids(state_rows, geocode_missing=True)[0][map_cache.MAP_COLUMNS]
+        fips = fips_codes(located_df)
+        zoom = 4 if state == map_cache.NATIONAL else None
+        topology, _, zoom = county_shapes.state_topology(fips, zoom)
+        finest = county_shapes.subset(county_shapes.load_topology(county_shapes.ZOOM_LEVELS[-1]), fips)
+        start = time.perf_counter()
+        html = map_cache._build(state, located_df, options).encode()
+        seconds = time.perf_counter() - start
+        row = (kb(topology)[0], kb(finest)[0], kb(to_geojson(topology))[0], len(html) / 1024,
+               len(gzip.compress(html)) / 1024, seconds)
+        rows.append(row)
+        print(f"{state:<4} {len(fips):>8} {county_shapes.level_for(zoom):>4} {row[0]:>12.0f} {row[1]:>10.0f} "
+              f"{row[2]:>11.0f} {row[3]:>8.0f} {row[4]:>8.0f} {row[5]:>8.3f}")
+
+    states = np.array(rows[:-1])
+    print(f"{'states: median':<19} {np.median(states[:, 0]):>12.0f} {np.median(states[:, 1]):>10.0f} "
+          f"{np.median(states[:, 2]):>11.0f} {np.median(states[:, 3]):>8.0f} {np.median(states[:, 4]):>8.0f} "
+          f"{np.median(states[:, 5]):>8.3f}")
+    print(f"{'states: max':<19} {states[:, 0].max():>12.0f} {states[:, 1].max():>10.0f} "
+          f"{states[:, 2].max():>11.0f} {states[:, 3].max():>8.0f} {states[:, 4].max():>8.0f} {states[:, 5].max():>8.3f}")
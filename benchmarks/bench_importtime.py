@@ -0,0 +1,49 @@
+# Benchmark: cold-start import time per page, measured with -X importtime.
+#
+# Each measurement runs in a fresh interpreter. "router + <page>" is what the
+# router (data_to_web.py) imports before the selected page can render; the
+# "all pages (old router)" row is the import list data_to_web.py had when
+# every page lived inline in one script.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_importtime.py
+import subprocess
+import sys
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parent.parent / "code"
+
+CASES = {
+    "router only": "import streamlit, datasets",
+    "router + page1": "import streamlit, datasets, page1",
+    "router + page2": "import streamlit, datasets, page2",
+    "router + page3": "import streamlit, datasets, page3",
+    "page3 + statsmodels (first forecast)": "import streamlit, datasets, page3; "
+                                            "from statsmodels.tsa.statespace.sarimax import SARIMAX",
+    "all pages (old router)": "import streamlit, pandas, altair, folium, geopy.geocoders, folium.plugins, "
+                              "numpy, plotly.graph_objects; "
+                              "from statsmodels.tsa.statespace.sarimax import SARIMAX",
+}
+
+
+def import_time(statement):
+    # Total import time in ms: the sum of every module's self time
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=CODE_DIR, capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us = line.split(":", 1)[1].split("|")[0]
+        total_us += int(self_us)
+    return total_us / 1000
+
+
+if __name__ == "__main__":
+    repeat = 3
+    print(f"{'case':<40} {'import time (ms)':>16}")
+    for name, statement in CASES.items():
+        best = min(import_time(statement) for _ in range(repeat))
+        print(f"{name:<40} {best:>16.0f}")
@@ -0,0 +1,51 @@
+# Benchmark: monthly refresh by incremental update against a full re-search.
+#
+# Simulates the timeseries sheet gaining its last N months: a search is run
+# and stored for the series without them, then the full series is handled
+# once by sarima.update_search (extend the stored model through the Kalman
+# filter) and once by a full search. Uses a temporary model store.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_incremental.py [new_months]
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import model_store  # noqa: E402
+import sarima  # noqa: E402
+from ingest import load_dataset  # noqa: E402
+
+SETTINGS = (sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS)
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_new = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    y = sarima.default_series(load_dataset("timeseries"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_store.MODELS_DIR = Path(tmp)
+        for method in sarima.SEARCH_METHODS:
+            y_previous = y.iloc[:-n_new]
+            previous = sarima.search(y_previous, *SETTINGS, method, workers=1)
+            sarima.save_search(sarima.search_key(y_previous, *SETTINGS, method), previous)
+
+            updated, update_seconds = timed(sarima.update_search, y, *SETTINGS, method)
+            full, search_seconds = timed(sarima.search, y, *SETTINGS, method, workers=1)
+            print(f"{method}: {len(y_previous)} -> {len(y)} months")
+            if updated is None:
+                print("  forecast errors drifted; a full search is needed")
+            else:
+                print(f"  incremental update {update_seconds * 1000:8.1f} ms  "
+                      f"{updated.best_order}{updated.best_seasonal_order} AIC={updated.best_aic:.3f} "
+                      f"drift={updated.drift:.2f}")
+            print(f"  full search        {search_seconds * 1000:8.1f} ms  "
+                  f"{full.best_order}{full.best_seasonal_order} AIC={full.best_aic:.3f}")
@@ -0,0 +1,80 @@
+# Benchmark: bulk map layer against one folium Marker per county.
+#
+# Builds the location page's map for a few states and for every county
+# (map_cache.NATIONAL) twice: the way the page used to (a folium.Marker,
+# Popup and Icon per row of iterrows() into a MarkerCluster) and with
+# map_cache.build_map_html (one FastMarkerCluster data array, popups made in
+# the browser). Reports build time and HTML payload, raw and gzipped.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_map_layer.py [state ...]
+import gzip
+import sys
+import time
+from pathlib import Path
+
+import folium
+from folium.plugins import HeatMap, MarkerCluster
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import map_cache  # noqa: E402
+from datasets import get_dataset  # noqa: E402
+from gazetteer import attach_centroids  # noqa: E402
+from state_index import get_state_index  # noqa: E402
+
+REPEATS = 3
+
+
+def per_marker_html(located_df, zoom_start=5):
+    # The page's previous map code
+    map_obj = folium.Map(location=[37.0902, -95.7129], zoom_start=zoom_start)
+    marker_cluster = MarkerCluster().add_to(map_obj)
+    heat_data = []
+    for index, row in located_df.iterrows():
+        latitude, longitude = row['Latitude'], row['Longitude']
+        folium.Marker(
+            location=[latitude, longitude],
+            popup=folium.Popup(f"""
+                <b>County:</b> {row['County Name']}<br>
+                <b>Median Salary:</b> ${row['Median Annual Advertised Salary']}<br>
+                <b>Unique Postings:</b> {row['Unique Postings from Jan 2023 - Dec 2023']}<br>
+                <b>Median Posting Duration:</b> {row['Median Posting Duration from Jan 2023 - Dec 2023']} days
+            """, max_width=300),
+            icon=folium.Icon(color="blue", icon="info-sign")
+        ).add_to(marker_cluster)
+        heat_data.append([latitude, longitude, row['Median Annual Advertised Salary']])
+    HeatMap(heat_data).add_to(map_obj)
+    return map_obj._repr_html_()
+
+
+def bulk_html(located_df, zoom_start=5):
+    return map_cache.build_map_html(located_df, map_cache.DEFAULT_OPTIONS, zoom_start)
+
+
+def measure(build, located_df, zoom_start):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        html = build(located_df, zoom_start)
+        best = min(best, time.perf_counter() - start)
+    payload = html.encode()
+    return best, len(payload) / 1024, len(gzip.compress(payload)) / 1024
+
+
+if __name__ == "__main__":
+    states = sys.argv[1:] or ["TX", "CA"]
+    index = get_state_index()
+    views = [(state, index[state].rows, 5) for state in states] + [
+        (map_cache.NATIONAL, get_dataset("locations"), 4)]
+
+    print(f"{'map':<6} {'counties':>8} {'builder':<11} {'build s':>8} {'HTML KB':>8} {'gzip KB':>8}")
+    for name, rows, zoom_start in views:
+        located_df = attach_centroids(rows, geocode_missing=True)[0]
+        results = {}
+        for label, build in [("per marker", per_marker_html), ("bulk", bulk_html)]:
+            results[label] = measure(build, located_df, zoom_start)
+            seconds, raw_kb, gzip_kb = results[label]
+            print(f"{name:<6} {len(located_df):>8} {label:<11} {seconds:>8.3f} {raw_kb:>8.0f} {gzip_kb:>8.0f}")
+        (old_s, old_kb, old_gz), (new_s, new_kb, new_gz) = results["per marker"], results["bulk"]
+        print(f"{'':<6} {'':>8} {'ratio':<11} {old_s / new_s:>7.0f}x {old_kb / new_kb:>7.1f}x {old_gz / new_gz:>7.1f}x")
@@ -0,0 +1,102 @@
+# Benchmark: sparse against dense hierarchical reconciliation.
+#
+# Builds the national / state / county hierarchy from the location sheet's
+# county -> state mapping, padded with extra counties (spread over the states
+# like the real ones) up to the requested number, and synthetic incoherent
+# base forecasts and one-step residuals. Every method of reconcile.py is then
+# timed against the textbook dense version (dense summing matrix, and for
+# MinT the series x series covariance and G = (S' W^-1 S)^-1 S' W^-1), with
+# the peak memory of each and the largest difference between the two.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_reconcile.py [counties]
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import reconcile  # noqa: E402
+from datasets import get_dataset  # noqa: E402
+
+N_MONTHS = 60
+STEPS = 12
+
+
+def hierarchy(n_counties, rng):
+    county_states = get_dataset("locations")["State Name"].astype(str).to_numpy()
+    if n_counties > len(county_states):
+        county_states = np.concatenate([county_states, rng.choice(county_states, n_counties - len(county_states))])
+    county_states = np.sort(county_states[:n_counties])
+    states = np.unique(county_states)
+    return pd.concat([
+        pd.DataFrame({"Level": ["National"], "State": [""]}),
+        pd.DataFrame({"Level": "State", "State": states}),
+        pd.DataFrame({"Level": "County", "State": county_states}),
+    ], ignore_index=True)
+
+
+def synthetic(S, bottom, rng):
+    # (history, base forecasts, residuals): coherent histories, base forecasts
+    # with independent noise per series, residuals with a common component
+    n_counties = S.shape[1]
+    season = 1 + 0.1 * np.sin(2 * np.pi * np.arange(N_MONTHS + STEPS) / 12)
+    scale = rng.lognormal(5, 1, n_counties)
+    counties = scale[:, None] * season * rng.lognormal(0, 0.05, (n_counties, N_MONTHS + STEPS))
+    history = S @ counties[:, :N_MONTHS]
+    truth = S @ counties[:, N_MONTHS:]
+    base = truth * rng.lognormal(0, 0.05, truth.shape)
+    sd = np.sqrt(np.abs(S @ scale))
+    residuals = (rng.normal(size=(N_MONTHS, 1)) + rng.normal(size=(N_MONTHS, len(sd)))) * sd
+    return history, base, residuals
+
+
+def dense_reconcile(S, bottom, base, history, residuals, method):
+    S = S.toarray()
+    if method == "Bottom-up":
+        return S @ base[bottom]
+    if method == "Top-down":
+        shares = np.mean(history[bottom] / history[0], axis=1)
+        return S @ (shares[:, None] * base[0])
+    lam = reconcile.shrinkage_intensity(residuals)
+    covariance = residuals.T @ residuals / len(residuals)
+    W = (1 - lam) * covariance
+    W[np.diag_indices_from(W)] = np.diag(covariance)
+    W_inv_S = np.linalg.solve(W, S)
+    return S @ np.linalg.solve(S.T @ W_inv_S, W_inv_S.T @ base)
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+if __name__ == "__main__":
+    n_counties = int(sys.argv[1]) if len(sys.argv) > 1 else 3194
+    rng = np.random.default_rng(0)
+    ids = hierarchy(n_counties, rng)
+    (S, bottom), build_seconds, build_mb = measure(reconcile.summing_matrix, ids)
+    history, base, residuals = synthetic(S, bottom, rng)
+    print(f"{len(ids)} series ({bottom.sum()} counties, {(ids['Level'] == 'State').sum()} states); "
+          f"summing matrix built in {build_seconds * 1000:.1f} ms")
+    print(f"S: sparse {(S.data.nbytes + S.indices.nbytes + S.indptr.nbytes) / 1024:.0f} KB, "
+          f"dense {S.shape[0] * S.shape[1] * 8 / 1024 / 1024:.0f} MB; "
+          f"base forecasts off by up to {reconcile.incoherence(S, bottom, base):.0f}")
+    print()
+    print(f"{'method':<12} {'sparse s':>9} {'peak MB':>8} {'dense s':>9} {'peak MB':>8} {'speedup':>8} "
+          f"{'max diff':>9} {'gap after':>9}")
+    for method in reconcile.METHODS:
+        sparse, sparse_seconds, sparse_mb = measure(reconcile.reconcile, S, bottom, base, history, residuals, method)
+        dense, dense_seconds, dense_mb = measure(dense_reconcile, S, bottom, base, history, residuals, method)
+        print(f"{method:<12} {sparse_seconds:>9.4f} {sparse_mb:>8.1f} {dense_seconds:>9.4f} {dense_mb:>8.1f} "
+              f"{dense_seconds / sparse_seconds:>7.0f}x {np.max(np.abs(sparse - dense)):>9.2g} "
+              f"{reconcile.incoherence(S, bottom, sparse):>9.2g}")
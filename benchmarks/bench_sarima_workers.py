@@ -0,0 +1,53 @@
+# Benchmark: wall-clock time of the SARIMA grid search against worker count.
+#
+# Uses the timeseries page's default series and seasonal settings. Pool
+# start-up is excluded (the pool lives for the whole server process), and the
+# best model must be the same for every worker count.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_sarima_workers.py [max_workers]
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import sarima  # noqa: E402
+from ingest import load_dataset  # noqa: E402
+
+
+def run(y, workers):
+    if workers > 1:
+        # Start the pool and import statsmodels in the workers first
+        pool = sarima.get_pool(workers)
+        list(pool.map(sarima._fit_summary, range(workers), [y] * workers,
+                      [(0, 0, 0)] * workers, [(0, 0, 0, 0)] * workers))
+    start = time.perf_counter()
+    result = sarima.grid_search(y, sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS, workers=workers)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    y = sarima.default_series(load_dataset("timeseries"))
+
+    print(f"{os.cpu_count()} CPUs, {len(list(sarima.candidate_orders(1, 12)))} candidates")
+    print(f"{'workers':>7} {'wall (s)':>9} {'speedup':>8}  best model")
+    baseline = first = None
+    workers = 1
+    while workers <= max_workers:
+        result, seconds = run(y, workers)
+        baseline = baseline or seconds
+        if first is None:
+            first = result
+        print(f"{workers:>7} {seconds:>9.2f} {baseline / seconds:>7.2f}x  "
+              f"{result.best_order}{result.best_seasonal_order} AIC={result.best_aic:.3f}")
+        # The parallel search must pick the serial search's model
+        assert result.best_order == first.best_order, (result.best_order, first.best_order)
+        assert result.best_seasonal_order == first.best_seasonal_order, \
+            (result.best_seasonal_order, first.best_seasonal_order)
+        assert np.isclose(result.best_aic, first.best_aic, rtol=1e-6, atol=1e-6), (result.best_aic, first.best_aic)
+        workers *= 2
@@ -0,0 +1,80 @@
+# Benchmark: county radius and k-NN queries, KD-tree against brute force.
+#
+# Every located county in turn is the query: counties within the radius, and
+# its k nearest neighbours (all, and only those paying a higher median
+# salary), through spatial_index.CountyIndex's positional queries and by
+# computing the haversine distance to every county with NumPy (both sorted by
+# distance). Reports the mean time per query, with and without building the
+# result rows, and checks that both give the same counties.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_spatial_index.py [miles] [k]
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+from datasets import get_dataset  # noqa: E402
+from gazetteer import attach_centroids  # noqa: E402
+from spatial_index import CountyIndex, haversine_miles  # noqa: E402
+from state_index import SALARY_COL  # noqa: E402
+
+
+def brute_within(index, origin, miles):
+    distances = haversine_miles(index.lat[origin], index.lon[origin], index.lat, index.lon)
+    found = np.flatnonzero(distances <= miles)
+    return found[np.argsort(distances[found])]
+
+
+def brute_nearest(index, origin, k, mask):
+    distances = haversine_miles(index.lat[origin], index.lon[origin], index.lat, index.lon)
+    distances[origin] = np.inf
+    if mask is not None:
+        distances[~mask] = np.inf
+    found = np.argpartition(distances, k)[:k]
+    found = found[np.isfinite(distances[found])]
+    return found[np.argsort(distances[found])]
+
+
+def timed(label, function, queries):
+    start = time.perf_counter()
+    results = [function(query) for query in queries]
+    print(f"{label:<34} {(time.perf_counter() - start) / len(queries) * 1000:8.3f} ms/query")
+    return results
+
+
+if __name__ == "__main__":
+    miles = float(sys.argv[1]) if len(sys.argv) > 1 else 50
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    start = time.perf_counter()
+    index = CountyIndex(attach_centroids(get_dataset("locations"), geocode_missing=True)[0])
+    print(f"{len(index.counties)} counties, index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    fips = index.counties["FIPS"].tolist()
+    salaries = index.counties[SALARY_COL].to_numpy(dtype=float)
+    origins = range(len(fips))
+
+    def same(tree_results, brute_results):
+        return all(set(found) == set(expected) for (found, _), expected in zip(tree_results, brute_results))
+
+    tree = timed(f"within {miles:g} mi, KD-tree", lambda i: index.within_positions(i, miles), origins)
+    brute = timed(f"within {miles:g} mi, brute force", lambda i: brute_within(index, i, miles), origins)
+    assert same(tree, brute)
+    print(f"  mean counties within {miles:g} mi: {np.mean([len(found) for found, _ in tree]):.1f}")
+
+    tree = timed(f"{k} nearest, KD-tree", lambda i: index.nearest_positions(i, k), origins)
+    brute = timed(f"{k} nearest, brute force", lambda i: brute_nearest(index, i, k, None), origins)
+    assert same(tree, brute)
+
+    tree = timed(f"{k} nearest paying more, KD-tree",
+                 lambda i: index.nearest_positions(i, k, salaries > salaries[i]), origins)
+    brute = timed(f"{k} nearest paying more, brute force",
+                  lambda i: brute_nearest(index, i, k, salaries > salaries[i]), origins)
+    assert same(tree, brute)
+
+    # With the result rows, as the page uses them
+    timed(f"within {miles:g} mi, KD-tree, rows", lambda i: index.within(fips[i], miles), origins)
+    timed(f"{k} nearest, KD-tree, rows", lambda i: index.nearest(fips[i], k), origins)
@@ -0,0 +1,57 @@
+# Benchmark: latency of switching the selected state on the location page.
+#
+# "before" is what each rerun used to do: a boolean filter over all counties,
+# then idxmax/idxmin and the county list. "after" is a lookup in the
+# precomputed state index (state_index.py).
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_state_switch.py
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+from ingest import load_dataset  # noqa: E402
+from state_index import build_state_index  # noqa: E402
+
+SALARY_COL = 'Median Annual Advertised Salary'
+
+
+def switch_before(df, state):
+    filtered_df = df[df['State Name'] == state]
+    highest = filtered_df.loc[filtered_df[SALARY_COL].idxmax()]
+    lowest = filtered_df.loc[filtered_df[SALARY_COL].idxmin()]
+    counties = filtered_df['County Name'].unique()
+    return filtered_df, highest, lowest, counties
+
+
+def switch_after(index, state):
+    entry = index[state]
+    return entry.rows, entry.highest_salary_row, entry.lowest_salary_row, entry.counties
+
+
+def time_switches(switch, source, states, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for state in states:
+            switch(source, state)
+    return (time.perf_counter() - start) / (repeat * len(states))
+
+
+if __name__ == "__main__":
+    df = load_dataset("locations")
+
+    start = time.perf_counter()
+    index = build_state_index(df)
+    build_time = time.perf_counter() - start
+
+    states = list(index)
+    before = time_switches(switch_before, df, states, repeat=20)
+    after = time_switches(switch_after, index, states, repeat=2000)
+
+    print(f"{len(df)} counties, {len(states)} states")
+    print(f"index build (once per process): {build_time * 1000:8.2f} ms")
+    print(f"state switch, boolean scan:     {before * 1e6:8.1f} us")
+    print(f"state switch, index lookup:     {after * 1e6:8.3f} us")
+    print(f"speedup: {before / after:,.0f}x")
@@ -0,0 +1,35 @@
+# Benchmark: stepwise order search against the full grid search.
+#
+# Uses the timeseries page's default series and seasonal period. Prints the
+# number of models each search fitted, its wall-clock time and the best AIC.
+# The grid uses the page's default Seasonal I (D); the stepwise search picks
+# d and D itself and searches wider order ranges (see code/stepwise.py).
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_stepwise.py
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import sarima  # noqa: E402
+import stepwise  # noqa: E402
+from ingest import load_dataset  # noqa: E402
+
+
+def run(method, y):
+    start = time.perf_counter()
+    result = sarima.search(y, sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS, method, workers=1)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    y = sarima.default_series(load_dataset("timeseries"))
+    d, D = stepwise.choose_differencing(y, sarima.DEFAULT_SEASONAL_PERIODS)
+    print(f"{len(y)} months; unit-root tests picked d={d}, D={D}")
+    print(f"{'method':<9} {'fits':>5} {'wall (s)':>9} {'AIC':>10}  best model")
+    for method in sarima.SEARCH_METHODS:
+        result, seconds = run(method, y)
+        print(f"{method:<9} {result.n_fits:>5} {seconds:>9.2f} {result.best_aic:>10.3f}  "
+              f"{result.best_order}{result.best_seasonal_order}")
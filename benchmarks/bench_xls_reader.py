@@ -0,0 +1,47 @@
+# Benchmark: pd.read_excel against the sheet-selective reader (xls_reader.py).
+#
+# Reports parse time and peak Python memory (tracemalloc) for every sheet the
+# dashboard uses, and checks that both readers return the same frame.
+#
+# Run this in the Terminal:
+#   python benchmarks/bench_xls_reader.py
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+import pandas as pd  # noqa: E402
+
+from ingest import SOURCES, source_path  # noqa: E402
+from xls_reader import read_sheet  # noqa: E402
+
+
+def measure(read, repeat=5):
+    # Best-of-N wall time, then peak traced memory of one more call
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = read()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, best, peak
+
+
+if __name__ == "__main__":
+    print(f"{'sheet':<12} {'reader':<12} {'time (ms)':>10} {'peak (KB)':>10}")
+    for name, source in SOURCES.items():
+        path = source_path(name)
+        pandas_df, pandas_time, pandas_peak = measure(
+            lambda: pd.read_excel(path, sheet_name=source["sheet"], skiprows=source["skiprows"], engine="xlrd"))
+        sheet_df, sheet_time, sheet_peak = measure(
+            lambda: read_sheet(path, source["sheet"], skiprows=source["skiprows"]))
+        pd.testing.assert_frame_equal(pandas_df, sheet_df)
+
+        print(f"{name:<12} {'read_excel':<12} {pandas_time * 1000:>10.1f} {pandas_peak / 1024:>10.0f}")
+        print(f"{name:<12} {'read_sheet':<12} {sheet_time * 1000:>10.1f} {sheet_peak / 1024:>10.0f}")
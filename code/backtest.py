@@ -0,0 +1,208 @@
+# Rolling-origin backtests of the forecasting engines.
+#
+# The Unique Postings series is cut into folds: every fold trains a model on
+# the months before its forecast origin (all of them for an expanding window,
+# the last `initial` for a sliding one) and forecasts the next `horizon`
+# months. Forecasts are scored on the original scale with MAPE, sMAPE and MASE
+# (scaled by the in-sample seasonal naive error), and the fit time of every
+# fold is recorded.
+#
+# A model is any engine of forecasters.py; SARIMA can also be given fixed
+# orders instead of running its order search in every fold. SARIMA folds run
+# on the SARIMA process pool; the NumPy engines are cheaper than a pool round
+# trip and run in this process. Fold results are cached in SQLite, keyed by
+# the training data and the model, so a rerun only computes new folds.
+#
+# Run this in the Terminal:
+#   python code/backtest.py [--window sliding] [--horizon 6] [--initial 36]
+#       [--model "Theta"] [--model "SARIMA(0,1,1)(0,1,1,12)"] ...
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+import sarima
+from forecasters import ENGINES, ModelSpec
+from ingest import CACHE_DIR
+
+BACKTEST_DB_PATH = CACHE_DIR / "backtest.sqlite"
+
+DEFAULT_HORIZON = 6
+DEFAULT_INITIAL = 36  # months in the first (expanding) or every (sliding) training window
+DEFAULT_STEP = 1
+# Shortest training window every engine can be fitted on
+MIN_INITIAL = max(engine.min_obs for engine in ENGINES.values())
+
+
+DEFAULT_MODELS = [ModelSpec(name) for name in ENGINES]
+
+
+def make_folds(n_obs, horizon=DEFAULT_HORIZON, initial=DEFAULT_INITIAL, step=DEFAULT_STEP, window="expanding"):
+    # [(train_start, train_end)]; a fold forecasts [train_end, train_end + horizon)
+    if window not in ("expanding", "sliding"):
+        raise ValueError(f"Unknown window: {window!r}")
+    if initial < MIN_INITIAL:
+        raise ValueError(f"initial={initial} months is too short; the engines need at least {MIN_INITIAL} to train")
+    return [(0 if window == "expanding" else end - initial, end)
+            for end in range(initial, n_obs - horizon + 1, step)]
+
+
+def fold_forecast(spec, log_train, horizon, seasonal_periods):
+    # (forecast of the log series, fit seconds); runs in a pool worker for SARIMA
+    start = time.perf_counter()
+    # workers=1: already in a pool worker, or running serially
+    forecast = spec.make(seasonal_periods, workers=1).fit(log_train).forecast(horizon)
+    return np.asarray(forecast, dtype=float), time.perf_counter() - start
+
+
+# --- Accuracy measures (actual and forecast on the original scale) ---
+def mape(actual, forecast):
+    return float(np.mean(np.abs(actual - forecast) / np.abs(actual)) * 100)
+
+
+def smape(actual, forecast):
+    return float(np.mean(2 * np.abs(actual - forecast) / (np.abs(actual) + np.abs(forecast))) * 100)
+
+
+def mase(actual, forecast, train, seasonal_periods):
+    # Mean absolute error over that of the in-sample seasonal naive forecast
+    m = seasonal_periods if 1 < seasonal_periods < len(train) else 1
+    scale = np.mean(np.abs(train[m:] - train[:-m]))
+    return float(np.mean(np.abs(actual - forecast)) / scale)
+
+
+class FoldCache:
+    # SQLite table of fold key -> (forecast, fit seconds)
+
+    def __init__(self, path=BACKTEST_DB_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS folds (
+                    key TEXT PRIMARY KEY,
+                    forecast TEXT NOT NULL,
+                    fit_seconds REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, forecast, fit_seconds in conn.execute(
+                        f"SELECT key, forecast, fit_seconds FROM folds WHERE key IN ({placeholders})", chunk):
+                    found[key] = (np.array(json.loads(forecast)), fit_seconds)
+        return found
+
+    def put(self, key, forecast, fit_seconds):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO folds VALUES (?, ?, ?)",
+                         (key, json.dumps(np.asarray(forecast).tolist()), fit_seconds))
+
+
+def fold_key(spec, log_train, horizon, seasonal_periods):
+    digest = hashlib.sha256()
+    digest.update(np.asarray(log_train, dtype=np.float64).tobytes())
+    digest.update(f"{spec.label}|h={horizon}|s={seasonal_periods}|v={sarima.SEARCH_VERSION}".encode())
+    return digest.hexdigest()[:32]
+
+
+def run_backtest(postings, models=None, horizon=DEFAULT_HORIZON, initial=DEFAULT_INITIAL, step=DEFAULT_STEP,
+                 window="expanding", seasonal_periods=sarima.DEFAULT_SEASONAL_PERIODS, workers=None,
+                 cache=None, log=None):
+    # Backtest every model on the postings series; returns (summary, folds)
+    # DataFrames. Models are fitted on the log of the series, like the page.
+    # `workers` is the size of the process pool for SARIMA folds only: a
+    # NumPy engine fold takes a millisecond or two, less than sending it to a
+    # pool worker and back, so those always run in this process.
+    models = DEFAULT_MODELS if models is None else models
+    workers = sarima.default_workers() if workers is None else workers
+    cache = FoldCache() if cache is None else cache
+    actual_all = np.asarray(postings, dtype=float)
+    log_all = np.log(actual_all)
+    folds = make_folds(len(actual_all), horizon, initial, step, window)
+    if not folds:
+        raise ValueError(f"{len(actual_all)} observations are too few for initial={initial}, horizon={horizon}")
+
+    tasks = {(spec, fold): fold_key(spec, log_all[fold[0]:fold[1]], horizon, seasonal_periods)
+             for spec in models for fold in folds}
+    outcomes = {}
+    cached = cache.get_many(tasks.values())
+    for task, key in tasks.items():
+        if key in cached:
+            outcomes[task] = cached[key]
+    missing = [task for task in tasks if task not in outcomes]
+    if log:
+        log(f"{len(tasks)} folds, {len(tasks) - len(missing)} cached")
+
+    def store(task, outcome):
+        outcomes[task] = outcome
+        cache.put(tasks[task], *outcome)
+
+    # SARIMA folds in parallel on the process pool, the rest here
+    pooled = [task for task in missing if task[0].engine == "SARIMA" and workers > 1]
+    if log and pooled:
+        log(f"{len(pooled)} SARIMA folds on {workers} workers, {len(missing) - len(pooled)} folds in this process")
+    for spec, fold in missing:
+        if (spec, fold) not in pooled:
+            store((spec, fold), fold_forecast(spec, log_all[fold[0]:fold[1]], horizon, seasonal_periods))
+    if pooled:
+        pool = sarima.get_pool(workers)
+        futures = {pool.submit(fold_forecast, spec, log_all[fold[0]:fold[1]], horizon, seasonal_periods): (spec, fold)
+                   for spec, fold in pooled}
+        for future in as_completed(futures):
+            store(futures[future], future.result())
+
+    rows = []
+    for (spec, (start, end)), (log_forecast, fit_seconds) in outcomes.items():
+        actual = actual_all[end:end + horizon]
+        forecast = np.exp(log_forecast)
+        rows.append({
+            "Model": spec.label,
+            "Origin": end,
+            "Train Months": end - start,
+            "MAPE": mape(actual, forecast),
+            "sMAPE": smape(actual, forecast),
+            "MASE": mase(actual, forecast, actual_all[start:end], seasonal_periods),
+            "Fit Seconds": fit_seconds,
+        })
+    folds_df = pd.DataFrame(rows).sort_values(["Model", "Origin"]).reset_index(drop=True)
+    summary = (folds_df.groupby("Model", sort=False)
+               .agg(Folds=("Origin", "size"), MAPE=("MAPE", "mean"), sMAPE=("sMAPE", "mean"),
+                    MASE=("MASE", "mean"), **{"Fit ms": ("Fit Seconds", lambda s: s.mean() * 1000)})
+               .sort_values("MASE").reset_index())
+    return summary, folds_df
+
+
+if __name__ == "__main__":
+    from ingest import load_dataset
+
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecasting engines")
+    parser.add_argument("--model", action="append", type=ModelSpec.parse, dest="models",
+                        help="engine name or SARIMA(p,d,q)(P,D,Q,s); repeat for several (default: every engine)")
+    parser.add_argument("--window", choices=["expanding", "sliding"], default="expanding")
+    parser.add_argument("--horizon", type=int, default=DEFAULT_HORIZON)
+    parser.add_argument("--initial", type=int, default=DEFAULT_INITIAL)
+    parser.add_argument("--step", type=int, default=DEFAULT_STEP)
+    parser.add_argument("--seasonal-periods", type=int, default=sarima.DEFAULT_SEASONAL_PERIODS)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process-pool workers for SARIMA folds (the other engines run in this process)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary, _ = run_backtest(load_dataset("timeseries")["Unique Postings"], args.models, args.horizon,
+                              args.initial, args.step, args.window, args.seasonal_periods, args.workers, log=print)
+    print(summary.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    print(f"{time.perf_counter() - start:.2f} s")
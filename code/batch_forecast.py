@@ -0,0 +1,190 @@
+# Batch forecasts for the nation, every state and every county.
+#
+# The workbooks only have a national monthly series ("Job Postings
+# Timeseries"); the location sheet has each county's unique postings for
+# 2023. County series are therefore the national series allocated by each
+# county's share of the 2023 postings, and state series are the sums of
+# their counties. Counties without postings are left out.
+#
+# The series are stacked into one (series x months) array. The NumPy engines
+# fit it a chunk of rows at a time (see forecasters.py); SARIMA fits rows on
+# the SARIMA process pool. Every engine's forecasts are also reconciled (see
+# reconcile.py) so that counties add up to their state and states to the
+# nation. All forecasts go into one Parquet file in long format (one row per
+# series, engine and month, with a column per reconciliation method) that the
+# timeseries page reads.
+#
+# While the county series are allocations of the national one, they are only
+# illustrative: every engine's forecasts of them are the national forecast
+# times the county's share, coherent to about 1e-8 before reconciliation, so
+# the reconciled columns equal the base forecasts. Reconciliation starts to
+# matter once series_panel() reads real monthly history per county.
+#
+# Run this in the Terminal:
+#   python code/batch_forecast.py [--model "Theta"] [--model "SARIMA(0,1,1)(0,1,1,12)"] [--steps 12]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import sarima
+from datasets import get_dataset
+from forecasters import ENGINES, ModelSpec
+from ingest import CACHE_DIR, source_key, write_parquet
+from reconcile import METHODS, incoherence, reconcile, summing_matrix
+from state_index import POSTINGS_COL
+
+CHUNK_ROWS = 256  # series per vectorized fit (bounds the engines' state arrays)
+SARIMA_CHUNK_ROWS = 32  # series per pool task
+DEFAULT_STEPS = 12
+DEFAULT_MODELS = [ModelSpec(name) for name in ENGINES if name != "SARIMA"]
+
+
+def series_panel():
+    # (ids, values, months): one row of `ids` (Level, State, FIPS, Series) per
+    # row of the (series x months) `values` array
+    timeseries = get_dataset("timeseries")
+    national = timeseries["Unique Postings"].to_numpy(dtype=float)
+    months = pd.DatetimeIndex(timeseries["Month"])
+
+    locations = get_dataset("locations")
+    # A county without a state would be in no state's total, so the hierarchy
+    # couldn't be coherent (none in the current workbook; see normalize.py)
+    counties = locations[(locations[POSTINGS_COL] > 0) & locations["State Name"].notna()]
+    postings = counties[POSTINGS_COL].to_numpy(dtype=float)
+    county_shares = postings / postings.sum()
+
+    states = counties.groupby("State Name", observed=True)[POSTINGS_COL].sum()
+    state_shares = states.to_numpy(dtype=float) / postings.sum()
+
+    ids = pd.concat([
+        pd.DataFrame({"Level": "National", "State": "", "FIPS": 0, "Series": "United States"}, index=[0]),
+        pd.DataFrame({"Level": "State", "State": states.index.astype(str), "FIPS": 0, "Series": states.index.astype(str)}),
+        pd.DataFrame({"Level": "County", "State": counties["State Name"].astype(str).to_numpy(),
+                      "FIPS": counties["County"].to_numpy(dtype=np.int32),
+                      "Series": counties["County Name"].astype(str).to_numpy()}),
+    ], ignore_index=True)
+    shares = np.concatenate([[1.0], state_shares, county_shares])
+    return ids, shares[:, None] * national[None, :], months
+
+
+def _fit_rows(spec, log_rows, steps, seasonal_periods):
+    # (mean, lower, upper, one-step errors) of the log series; runs in a pool
+    # worker for SARIMA
+    engine = spec.make(seasonal_periods, workers=1).fit(log_rows)
+    lower, upper = engine.interval(steps)
+    return engine.forecast(steps), lower, upper, engine.residuals()
+
+
+def forecast_panel(values, spec, steps=DEFAULT_STEPS, seasonal_periods=sarima.DEFAULT_SEASONAL_PERIODS, workers=None):
+    # (mean, lower, upper) arrays of shape (series x steps) and the in-sample
+    # one-step errors (series x months), all on the original scale
+    log_values = np.log(values)
+    workers = sarima.default_workers() if workers is None else workers
+    pooled = spec.engine == "SARIMA" and workers > 1
+    chunk_rows = SARIMA_CHUNK_ROWS if spec.engine == "SARIMA" else CHUNK_ROWS
+    chunks = [log_values[start:start + chunk_rows] for start in range(0, len(log_values), chunk_rows)]
+
+    if pooled:
+        pool = sarima.get_pool(workers)
+        outputs = list(pool.map(_fit_rows, [spec] * len(chunks), chunks, [steps] * len(chunks),
+                                [seasonal_periods] * len(chunks)))
+    else:
+        outputs = [_fit_rows(spec, chunk, steps, seasonal_periods) for chunk in chunks]
+    mean, lower, upper, log_errors = (np.concatenate(part) for part in zip(*outputs))
+    # Fitted value exp(log y - e) on the original scale
+    residuals = values - np.exp(log_values - log_errors)
+    return np.exp(mean), np.exp(lower), np.exp(upper), residuals
+
+
+def to_long(ids, months, spec, mean, lower, upper, reconciled=None):
+    # One row per series and forecast month
+    steps = mean.shape[1]
+    forecast_months = pd.date_range(months[-1], periods=steps + 1, freq="ME")[1:]
+    frame = ids.loc[ids.index.repeat(steps)].reset_index(drop=True)
+    frame.insert(0, "Engine", spec.label)
+    frame["Month"] = np.tile(forecast_months, len(ids))
+    frame["Forecast"] = mean.ravel().astype(np.float32)
+    frame["Lower"] = lower.ravel().astype(np.float32)
+    frame["Upper"] = upper.ravel().astype(np.float32)
+    for method, forecasts in (reconciled or {}).items():
+        frame[method] = forecasts.ravel().astype(np.float32)
+    for column in ["Engine", "Level", "State"]:
+        frame[column] = frame[column].astype("category")
+    return frame
+
+
+def output_path():
+    # Keyed by both source workbooks, so a new workbook means new forecasts
+    return CACHE_DIR / f"batch-forecasts-{source_key('timeseries')}-{source_key('locations')}.parquet"
+
+
+def is_fresh():
+    return output_path().exists()
+
+
+def run_batch(models=None, steps=DEFAULT_STEPS, seasonal_periods=sarima.DEFAULT_SEASONAL_PERIODS, workers=None, log=None):
+    # Forecast every series with every model and write the Parquet file.
+    # Engines already in the file and not re-run are kept.
+    models = DEFAULT_MODELS if models is None else models
+    ids, values, months = series_panel()
+    S, bottom = summing_matrix(ids)
+    frames = []
+    for spec in models:
+        start = time.perf_counter()
+        mean, lower, upper, residuals = forecast_panel(values, spec, steps, seasonal_periods, workers)
+        fitted = time.perf_counter()
+        # Not reconciled if a series has no forecast (a failed SARIMA fit)
+        reconciled = {}
+        if np.isfinite(mean).all():
+            reconciled = {method: reconcile(S, bottom, mean, values, residuals.T, method) for method in METHODS}
+        frames.append(to_long(ids, months, spec, mean, lower, upper, reconciled))
+        if log:
+            log(f"{spec.label:<24} {len(ids)} series {fitted - start:8.2f} s, "
+                f"reconciled {time.perf_counter() - fitted:6.3f} s, "
+                f"largest gap {incoherence(S, bottom, mean):.3g} -> "
+                f"{max((incoherence(S, bottom, f) for f in reconciled.values()), default=float('nan')):.3g}")
+
+    path = output_path()
+    if path.exists():
+        previous = pd.read_parquet(path)
+        frames.append(previous[~previous["Engine"].isin([spec.label for spec in models])])
+    result = pd.concat(frames, ignore_index=True)
+    for column in ["Engine", "Level", "State"]:
+        result[column] = result[column].astype(str).astype("category")
+    write_parquet(result, path)
+
+    # Remove outputs built from older workbooks
+    for old in CACHE_DIR.glob("batch-forecasts-*.parquet"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_shared(path, mtime):
+    # Shared by all sessions; `mtime` makes a rebuilt file a new entry
+    return pd.read_parquet(path)
+
+
+def get_batch_forecasts():
+    # The batch forecasts, or None if they haven't been built
+    path = output_path()
+    if not path.exists():
+        return None
+    return _load_shared(str(path), path.stat().st_mtime)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast the national, state and county series")
+    parser.add_argument("--model", action="append", type=ModelSpec.parse, dest="models",
+                        help="engine name or SARIMA(p,d,q)(P,D,Q,s); repeat for several (default: the NumPy engines)")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS)
+    parser.add_argument("--seasonal-periods", type=int, default=sarima.DEFAULT_SEASONAL_PERIODS)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    path = run_batch(args.models, args.steps, args.seasonal_periods, args.workers, log=print)
+    print(f"{path.relative_to(CACHE_DIR.parent.parent)} ({path.stat().st_size / 1024:.0f} KB)")
@@ -0,0 +1,341 @@
+# County boundaries for the choropleth map, as quantized TopoJSON.
+#
+# data/county_topology/ holds one TopoJSON file per zoom level in
+# ZOOM_LEVELS, built once from the U.S. Census Bureau cartographic boundary
+# file (cb_2016_us_county_500k, the source of the centroid table) by running
+# this module. The build:
+#   1. snaps every vertex to a fine grid and cuts the county rings into arcs
+#      at the junctions where three or more counties meet, so a border shared
+#      by two counties is stored once (the TopoJSON topology);
+#   2. ranks every arc vertex by its Visvalingam-Whyatt effective area in Web
+#      Mercator, once;
+#   3. for each zoom level keeps the vertices whose area is at least a square
+#      pixel at that zoom, re-quantizes them to a quarter pixel and writes the
+#      delta-encoded arcs.
+# Simplifying arcs rather than polygons keeps neighbouring counties'
+# simplified borders identical, so no gaps or overlaps appear between them.
+#
+# At run time a map takes the level matching its zoom and only the counties
+# it shows (state_topology), so a state's payload is a few tens of KB.
+# Geometry ids are the 5-digit FIPS codes, as in the centroid table.
+#
+# Run this in the Terminal to rebuild the files (needs pyshp, and the
+# shapefile from https://www2.census.gov/geo/tiger/GENZ2016/shp/cb_2016_us_county_500k.zip):
+#   python code/county_shapes.py path/to/cb_2016_us_county_500k.shp
+import argparse
+import gzip
+import heapq
+import json
+import math
+import time
+
+import numpy as np
+import streamlit as st
+
+from gazetteer import load_centroids
+from ingest import DATA_DIR
+
+TOPOLOGY_DIR = DATA_DIR / "county_topology"
+ZOOM_LEVELS = (4, 6, 8)
+GRID = 1e-5  # degrees, for finding shared vertices
+
+
+def topology_path(zoom):
+    return TOPOLOGY_DIR / f"counties-z{zoom}.topo.json.gz"
+
+
+def pixel_degrees(zoom):
+    # Width of a 256 px tile pixel at `zoom`, in degrees of longitude
+    return 360 / (256 * 2 ** zoom)
+
+
+# --- Build ---
+def read_counties(shapefile_path):
+    # {fips: [ring, ...]} with rings as (n x 2) arrays of grid coordinates
+    # (closing vertex dropped), for the counties of the centroid table
+    import shapefile
+
+    names = load_centroids().set_index("fips")
+    counties = {}
+    with shapefile.Reader(str(shapefile_path)) as reader:
+        for record, shape in zip(reader.iterRecords(fields=["GEOID"]), reader.iterShapes()):
+            fips = record[0]
+            if fips not in names.index:
+                continue  # territories
+            points = np.asarray(shape.points)
+            if fips.startswith("02"):
+                # Aleutian islands past the antimeridian, drawn next to the rest of Alaska
+                points[points[:, 0] > 0, 0] -= 360
+            grid = np.round(points / GRID).astype(np.int64)
+            rings = []
+            for start, stop in zip(shape.parts, list(shape.parts[1:]) + [len(points)]):
+                ring = grid[start:stop - 1]  # shapefile rings repeat their first vertex
+                keep = np.r_[True, np.any(ring[1:] != ring[:-1], axis=1)]
+                if keep.sum() >= 3:
+                    rings.append(ring[keep])
+            counties[fips] = rings
+    return counties
+
+
+def _codes(points):
+    # One int64 per grid vertex
+    return (points[:, 0] + (1 << 31)) << 32 | (points[:, 1] + (1 << 31))
+
+
+def find_junctions(rings):
+    # Codes of the vertices where rings part ways: a vertex is a junction when
+    # the rings through it don't all have the same two neighbours there
+    codes = [_codes(ring) for ring in rings]
+    vertex = np.concatenate(codes)
+    previous = np.concatenate([np.roll(code, 1) for code in codes])
+    following = np.concatenate([np.roll(code, -1) for code in codes])
+    pairs = np.stack([vertex, np.minimum(previous, following), np.maximum(previous, following)], axis=1)
+    unique = np.unique(pairs, axis=0)
+    counts = np.unique(unique[:, 0], return_counts=True)
+    return set(counts[0][counts[1] > 1].tolist())
+
+
+def cut_ring(ring, junctions):
+    # The ring's arcs, as (n x 2) arrays sharing their end vertices
+    codes = _codes(ring)
+    cuts = np.flatnonzero(np.isin(codes, list(junctions))) if junctions else np.array([], dtype=int)
+    if len(cuts) == 0:
+        # No junction: one closed arc, started at its smallest vertex so that
+        # the same ring seen from the other side is recognised
+        start = int(np.argmin(codes))
+        ring = np.roll(ring, -start, axis=0)
+        return [np.vstack([ring, ring[:1]])]
+    ring = np.roll(ring, -cuts[0], axis=0)
+    cuts = np.r_[cuts - cuts[0], len(ring)]
+    closed = np.vstack([ring, ring[:1]])
+    return [closed[start:stop + 1] for start, stop in zip(cuts[:-1], cuts[1:])]
+
+
+def build_topology(counties):
+    # (arcs, geometries): unique arcs as grid coordinate arrays, and per
+    # county a list of polygons, each a list of rings, each a list of arc
+    # references (~i for arc i reversed)
+    junctions = find_junctions([ring for rings in counties.values() for ring in rings])
+    arcs, arc_index = [], {}
+
+    def reference(arc):
+        forward, backward = arc.tobytes(), arc[::-1].tobytes()
+        key = min(forward, backward)
+        if key not in arc_index:
+            arc_index[key] = len(arcs)
+            arcs.append(arc if key == forward else arc[::-1])
+        index = arc_index[key]
+        return index if key == forward else ~index
+
+    geometries = {}
+    for fips, rings in counties.items():
+        polygons = _group_rings(rings)
+        geometries[fips] = [[[reference(arc) for arc in cut_ring(ring, junctions)] for ring in polygon]
+                            for polygon in polygons]
+    return arcs, geometries
+
+
+def _signed_area(ring):
+    x, y = ring[:, 0].astype(float), ring[:, 1].astype(float)
+    return (np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def _contains(ring, point):
+    # Even-odd point in polygon test
+    x, y = ring[:, 0].astype(float), ring[:, 1].astype(float)
+    x2, y2 = np.roll(x, -1), np.roll(y, -1)
+    crosses = (y > point[1]) != (y2 > point[1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        at = x + (point[1] - y) * (x2 - x) / (y2 - y)
+    return bool(np.count_nonzero(crosses & (point[0] < at)) % 2)
+
+
+def _group_rings(rings):
+    # Polygons [outer, hole, ...]: shapefile outer rings are clockwise, holes
+    # counter-clockwise; a hole goes with the outer ring containing it
+    outers = [ring for ring in rings if _signed_area(ring) < 0]
+    holes = [ring for ring in rings if _signed_area(ring) >= 0]
+    polygons = [[outer] for outer in outers]
+    for hole in holes:
+        for polygon in polygons:
+            if _contains(polygon[0], hole[0]):
+                polygon.append(hole)
+                break
+    return polygons
+
+
+def _mercator(arc):
+    lon = arc[:, 0] * GRID
+    lat = np.clip(arc[:, 1] * GRID, -85, 85)
+    return np.stack([lon, np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))], axis=1)
+
+
+def effective_areas(arc):
+    # Visvalingam-Whyatt: the area of the triangle a vertex forms with its
+    # neighbours when it is removed, smallest first, never less than that of
+    # a vertex removed before it. End vertices are kept (infinite area).
+    points = _mercator(arc)
+    n = len(points)
+    areas = np.full(n, np.inf)
+    if n < 3:
+        return areas
+
+    def triangle(i, j, k):
+        (ax, ay), (bx, by), (cx, cy) = points[i], points[j], points[k]
+        return abs((bx - ax) * (cy - ay) - (cx - ax) * (by - ay)) / 2
+
+    previous = list(range(-1, n - 1))
+    following = list(range(1, n + 1))
+    heap = [(triangle(i - 1, i, i + 1), i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    current = {i: area for area, i in heap}
+    largest = 0.0
+    while heap:
+        area, i = heapq.heappop(heap)
+        if current.get(i) != area:
+            continue  # stale entry
+        del current[i]
+        largest = max(largest, area)
+        areas[i] = largest
+        before, after = previous[i], following[i]
+        following[before], previous[after] = after, before
+        for j in (before, after):
+            if j in current:
+                current[j] = triangle(previous[j], j, following[j])
+                heapq.heappush(heap, (current[j], j))
+    return areas
+
+
+def level_topology(arcs, areas, geometries, zoom):
+    # TopoJSON dict of the counties simplified and quantized for `zoom`
+    threshold = pixel_degrees(zoom) ** 2
+    quantum = pixel_degrees(zoom) / 4
+    translate = np.min([arc.min(axis=0) for arc in arcs], axis=0) * GRID
+
+    encoded = []
+    for arc, area in zip(arcs, areas):
+        keep = area >= threshold
+        closed = np.array_equal(arc[0], arc[-1])
+        if closed and keep.sum() < 4:
+            keep[np.argsort(area[:-1])[-3:]] = True  # a closed ring keeps a triangle
+        points = np.round((arc[keep] * GRID - translate) / quantum).astype(np.int64)
+        points = points[np.r_[True, np.any(points[1:] != points[:-1], axis=1)]]
+        if len(points) == 1:
+            points = np.vstack([points, points])
+        deltas = np.vstack([points[:1], np.diff(points, axis=0)])
+        encoded.append(deltas.tolist())
+
+    names = load_centroids().set_index("fips")
+    objects = []
+    for fips, polygons in geometries.items():
+        single = len(polygons) == 1
+        objects.append({
+            "type": "Polygon" if single else "MultiPolygon",
+            "id": fips,
+            "properties": {"name": names.at[fips, "county_name"], "state": names.at[fips, "state"]},
+            "arcs": polygons[0] if single else polygons,
+        })
+    return {
+        "type": "Topology",
+        "transform": {"scale": [quantum, quantum], "translate": translate.round(6).tolist()},
+        "objects": {"counties": {"type": "GeometryCollection", "geometries": objects}},
+        "arcs": encoded,
+    }
+
+
+def build(shapefile_path, log=print):
+    start = time.perf_counter()
+    counties = read_counties(shapefile_path)
+    arcs, geometries = build_topology(counties)
+    n_points = sum(len(ring) for rings in counties.values() for ring in rings)
+    log(f"{len(counties)} counties, {n_points} vertices -> {len(arcs)} arcs, "
+        f"{sum(len(arc) for arc in arcs)} vertices ({time.perf_counter() - start:.1f} s)")
+    areas = [effective_areas(arc) for arc in arcs]
+    log(f"effective areas ({time.perf_counter() - start:.1f} s)")
+
+    TOPOLOGY_DIR.mkdir(parents=True, exist_ok=True)
+    for zoom in ZOOM_LEVELS:
+        topology = level_topology(arcs, areas, geometries, zoom)
+        payload = json.dumps(topology, separators=(",", ":")).encode()
+        with gzip.open(topology_path(zoom), "wb", compresslevel=9) as f:
+            f.write(payload)
+        n_kept = sum(len(arc) for arc in topology["arcs"])
+        log(f"zoom {zoom}: {n_kept} vertices, {len(payload) / 1024:.0f} KB "
+            f"({topology_path(zoom).stat().st_size / 1024:.0f} KB gzipped)")
+
+
+# --- Use ---
+@st.cache_resource(show_spinner=False)
+def load_topology(zoom):
+    with gzip.open(topology_path(zoom), "rb") as f:
+        return json.load(f)
+
+
+def level_for(zoom):
+    # The simplification level to draw a map at `zoom` with
+    return next((level for level in ZOOM_LEVELS if level >= zoom), ZOOM_LEVELS[-1])
+
+
+def subset(topology, fips):
+    # TopoJSON of the counties in `fips` only, with their arcs renumbered
+    wanted = set(fips)
+    geometries = [geometry for geometry in topology["objects"]["counties"]["geometries"] if geometry["id"] in wanted]
+    renumbered = {}
+
+    def renumber(arcs):
+        if isinstance(arcs, int):
+            index = arcs if arcs >= 0 else ~arcs
+            if index not in renumbered:
+                renumbered[index] = len(renumbered)
+            return renumbered[index] if arcs >= 0 else ~renumbered[index]
+        return [renumber(item) for item in arcs]
+
+    # New geometry and properties dicts: map layers add styles to the properties
+    geometries = [{**geometry, "properties": dict(geometry["properties"]), "arcs": renumber(geometry["arcs"])}
+                  for geometry in geometries]
+    arcs = [None] * len(renumbered)
+    for index, new_index in renumbered.items():
+        arcs[new_index] = topology["arcs"][index]
+    return {**topology, "objects": {"counties": {"type": "GeometryCollection", "geometries": geometries}},
+            "arcs": arcs}
+
+
+def topology_bounds(topology):
+    # [[south, west], [north, east]] of all arcs, or None without arcs
+    if not topology["arcs"]:
+        return None
+    scale, translate = topology["transform"]["scale"], topology["transform"]["translate"]
+    points = np.concatenate([np.cumsum(np.asarray(arc), axis=0) for arc in topology["arcs"]])
+    low = points.min(axis=0) * scale + translate
+    high = points.max(axis=0) * scale + translate
+    return [[float(low[1]), float(low[0])], [float(high[1]), float(high[0])]]
+
+
+def fit_zoom(bounds, width=800, height=600):
+    # Largest zoom at which `bounds` fit a width x height map
+    (south, west), (north, east) = bounds
+
+    def mercator_y(lat):
+        return math.degrees(math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)))
+
+    spans = [(east - west) / width, (mercator_y(north) - mercator_y(south)) / height]
+    return max(0, int(math.floor(math.log2(360 / 256 / max(max(spans), 1e-9)))))
+
+
+def state_topology(fips, zoom=None):
+    # (topology, bounds, zoom) for the counties in `fips`: simplified for
+    # `zoom`, or for the zoom that fits them on the map. Counties not in the
+    # 2016 boundaries (Connecticut's planning regions) are left out; bounds
+    # are None if none is left.
+    fips = list(fips)
+    if zoom is None:
+        bounds = topology_bounds(subset(load_topology(ZOOM_LEVELS[0]), fips))
+        zoom = ZOOM_LEVELS[0] if bounds is None else fit_zoom(bounds)
+    topology = subset(load_topology(level_for(zoom)), fips)
+    return topology, topology_bounds(topology), zoom
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the county TopoJSON files from the Census shapefile")
+    parser.add_argument("shapefile", help="path to cb_2016_us_county_500k.shp")
+    build(parser.parse_args().shapefile)
@@ -0,0 +1,58 @@
+# Shared data-access layer for all pages.
+#
+# Each dataset is loaded once per server process with st.cache_resource, so
+# every session reads the same frame instead of holding its own pickled copy
+# (which is what st.cache_data does on each hit). With pandas copy-on-write
+# enabled (data_to_web.py turns it on for the app), pages get a shallow copy
+# of the shared frame: adding or changing a column in it never touches the
+# shared data. Without copy-on-write (a page run on its own, the scripts in
+# the Terminal), a shallow copy could write into the shared frame, so they
+# get a deep copy instead. The cache key is the source hash, which
+# ingest.source_key() only recomputes when the workbook's modification time
+# or size changes.
+#
+# Run this in the Terminal to print the memory held by each dataset:
+#   python code/datasets.py
+import pandas as pd
+import streamlit as st
+
+from ingest import SOURCES, load_dataset, source_key
+
+# Shared frames loaded in this process, by dataset name
+_loaded = {}
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(SOURCES))
+def _load_shared(name, key):
+    # `key` is the source hash, so a changed workbook gets a new cache entry
+    return load_dataset(name)
+
+
+def get_dataset(name):
+    # Copy of the shared frame for one dataset (shallow under copy-on-write)
+    if name not in SOURCES:
+        raise KeyError(f"Unknown dataset: {name}")
+    df = _load_shared(name, source_key(name))
+    _loaded[name] = df
+    return df.copy(deep=not pd.options.mode.copy_on_write)
+
+
+def memory_report():
+    # Bytes held per dataset loaded in this process
+    rows = []
+    for name, df in sorted(_loaded.items()):
+        rows.append({
+            "Dataset": name,
+            "Rows": len(df),
+            "Columns": df.shape[1],
+            "Bytes": int(df.memory_usage(index=True, deep=True).sum()),
+        })
+    return pd.DataFrame(rows, columns=["Dataset", "Rows", "Columns", "Bytes"])
+
+
+if __name__ == "__main__":
+    for name in SOURCES:
+        get_dataset(name)
+    report = memory_report()
+    print(report.to_string(index=False))
+    print(f"Total: {report['Bytes'].sum():,} bytes")
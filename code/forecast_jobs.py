@@ -0,0 +1,138 @@
+# Background SARIMA searches for the timeseries page.
+#
+# A search runs on a thread of the server process (its fits go to the SARIMA
+# process pool), so the page can render the raw series straight away and poll
+# the job for progress and the best model found so far. Jobs are keyed by
+# sarima.search_key(): a session asking for a search that is already running,
+# or finished, gets the same job instead of starting another one. Finished
+# jobs double as the in-memory memo of search results (least recently used
+# are evicted); complete results are also written to the model store, so a
+# restarted server doesn't search again.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+import sarima
+
+# Number of finished jobs kept in memory
+MEMO_SIZE = 16
+
+
+class ForecastJob:
+    def __init__(self, key, total_fits):
+        self.key = key
+        self.total_fits = total_fits  # upper bound, for the progress bar
+        self.fits_done = 0
+        self.best = None  # (FitRecord, params) of the lowest AIC so far
+        self.result = None  # SearchResult once finished
+        self.error = None
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    def progress(self):
+        # Fraction of the (estimated) fits done
+        if self.done:
+            return 1.0
+        return min(self.fits_done / max(self.total_fits, 1), 0.99)
+
+    def best_so_far(self):
+        with self._lock:
+            return self.best
+
+    def wait(self, timeout=None):
+        # SearchResult once finished (re-raises a search error); None on timeout
+        if not self._finished.wait(timeout):
+            return None
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _on_fit(self, record, params):
+        with self._lock:
+            self.fits_done += 1
+            # Ranked like sarima.grid_search: fits without a finite AIC never count
+            usable = record.aic is not None and np.isfinite(record.aic)
+            if usable and (self.best is None or record.aic < self.best[0].aic):
+                self.best = (record, params)
+
+    def _finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self._finished.set()
+
+    def _run(self, key, y, seasonal_d, seasonal_periods, method):
+        try:
+            result = sarima.search(y, seasonal_d, seasonal_periods, method, on_fit=self._on_fit)
+            if not result.timed_out:
+                sarima.save_search(key, result)  # reused after a restart
+        except Exception as error:
+            self._finish(error=error)
+        else:
+            self._finish(result)
+
+
+class JobManager:
+    def __init__(self, memo_size=MEMO_SIZE):
+        self.memo_size = memo_size
+        self._jobs = OrderedDict()  # key -> ForecastJob, least recently used first
+        self._lock = threading.Lock()
+
+    def submit(self, y, seasonal_d, seasonal_periods, method=sarima.DEFAULT_METHOD):
+        # The job for this series and settings: an existing one, a finished one
+        # built from a saved or incrementally updated result, or a new
+        # background search (failed jobs are retried)
+        key = sarima.search_key(y, seasonal_d, seasonal_periods, method)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (job.done and job.error is not None):
+                self._jobs.move_to_end(key)
+                return job
+
+            job = ForecastJob(key, sarima.max_fits(method))
+            self._jobs[key] = job
+            self._evict()
+
+        # A stored result, or the previous one extended with new months (fast,
+        # so both run here rather than in the background). If either fails (a
+        # corrupt store entry, a failed update), fall back to a full search
+        # rather than leave the job unfinished
+        try:
+            saved = sarima.load_search(key, y)
+            if saved is None:
+                saved = sarima.update_search(y, seasonal_d, seasonal_periods, method)
+                if saved is not None:
+                    try:
+                        sarima.save_search(key, saved)
+                    except OSError:
+                        pass  # still a valid result, just not stored
+        except Exception:
+            saved = None
+        if saved is not None:
+            job._finish(saved)
+        else:
+            threading.Thread(target=job._run, args=(key, y, seasonal_d, seasonal_periods, method),
+                             name=f"forecast-{key}", daemon=True).start()
+        return job
+
+    def _evict(self):
+        # Drop the least recently used finished jobs beyond memo_size
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[:max(0, len(self._jobs) - self.memo_size)]:
+            del self._jobs[key]
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_manager():
+    # One manager per server process, shared by all sessions
+    return JobManager()
+
+
+def find_best_model(y, seasonal_d, seasonal_periods, method=sarima.DEFAULT_METHOD):
+    # Blocking lookup: the (shared) job's SearchResult
+    return get_job_manager().submit(y, seasonal_d, seasonal_periods, method).wait()
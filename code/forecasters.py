@@ -0,0 +1,336 @@
+# Forecasting engines for the timeseries page.
+#
+# Every engine has the same API:
+#   engine = ENGINES[name](seasonal_periods).fit(y)
+#   mean = engine.forecast(steps)
+#   lower, upper = engine.interval(steps, level=0.95)
+#   errors = engine.residuals()  # in-sample one-step forecast errors
+# `y` is one series (1-D) or a batch of series of the same length (2-D, one
+# series per row), at least `min_obs` months long; results have the same
+# number of dimensions. A series shorter than two seasons is fitted without
+# seasonality. The lightweight
+# engines are NumPy only: their recursions run over time once for every
+# series and smoothing parameter candidate at the same time, so a fit takes
+# well under a millisecond on a few years of months. SARIMA goes through
+# sarima.py and is much more expensive.
+import re
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+# Smoothing parameter candidates of the exponential smoothing engines
+ALPHAS = np.linspace(0.05, 0.95, 19)
+BETAS = np.array([0.0, 0.01, 0.05, 0.1, 0.2])
+GAMMAS = np.array([0.0, 0.01, 0.05, 0.1, 0.2, 0.3])
+
+
+class Forecaster:
+    name = None
+    # Fewest observations a fit needs: a trend or a one-step error takes two
+    min_obs = 2
+
+    def __init__(self, seasonal_periods=12):
+        self.seasonal_periods = seasonal_periods
+
+    def fit(self, y):
+        y = np.asarray(y, dtype=float)
+        self._one_series = y.ndim == 1
+        y = np.atleast_2d(y)
+        if y.shape[1] < self.min_obs:
+            raise ValueError(f"{self.name} needs at least {self.min_obs} observations, got {y.shape[1]}")
+        self._fit(y)
+        return self
+
+    def forecast(self, steps):
+        return self._shape(self._forecast(steps))
+
+    def interval(self, steps, level=0.95):
+        # Normal prediction interval around the point forecast
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        mean = self._forecast(steps)
+        sd = self._forecast_sd(steps)
+        return self._shape(mean - z * sd), self._shape(mean + z * sd)
+
+    def residuals(self):
+        # In-sample one-step forecast errors, NaN for months without a forecast
+        return self._shape(self.errors)
+
+    def _shape(self, values):
+        return values[0] if self._one_series else values
+
+    def _season(self, n_obs):
+        # Period to use, or 1 if the series is too short to estimate seasonality
+        m = self.seasonal_periods
+        return m if m > 1 and n_obs >= 2 * m else 1
+
+
+class SeasonalNaive(Forecaster):
+    # Each month repeats the same month of the last season
+    name = "Seasonal naive"
+
+    def _fit(self, y):
+        self.m = self._season(y.shape[1])
+        self.last = y[:, -self.m:]
+        errors = y[:, self.m:] - y[:, :-self.m]
+        self.sigma = np.sqrt(np.mean(errors ** 2, axis=1))
+        self.errors = np.concatenate([np.full((len(y), self.m), np.nan), errors], axis=1)
+
+    def _forecast(self, steps):
+        return self.last[:, np.arange(steps) % self.m]
+
+    def _forecast_sd(self, steps):
+        return self.sigma[:, None] * np.sqrt(np.arange(steps) // self.m + 1)
+
+
+class Drift(Forecaster):
+    # Straight line through the first and last observations
+    name = "Drift"
+
+    def _fit(self, y):
+        self.n_obs = y.shape[1]
+        self.last = y[:, -1]
+        self.slope = (y[:, -1] - y[:, 0]) / (self.n_obs - 1)
+        errors = np.diff(y, axis=1) - self.slope[:, None]
+        self.sigma = np.sqrt(np.sum(errors ** 2, axis=1) / max(self.n_obs - 2, 1))
+        self.errors = np.concatenate([np.full((len(y), 1), np.nan), errors], axis=1)
+
+    def _forecast(self, steps):
+        h = np.arange(1, steps + 1)
+        return self.last[:, None] + self.slope[:, None] * h
+
+    def _forecast_sd(self, steps):
+        h = np.arange(1, steps + 1)
+        return self.sigma[:, None] * np.sqrt(h * (1 + h / (self.n_obs - 1)))
+
+
+class HoltWinters(Forecaster):
+    # Additive Holt-Winters, i.e. ETS(A,A,A) (ETS(A,A,N) without seasonality),
+    # in error-correction form:
+    #   l_t = l_{t-1} + b_{t-1} + alpha e_t
+    #   b_t = b_{t-1} + beta e_t
+    #   s_t = s_{t-m} + gamma e_t
+    # The parameters minimizing the in-sample squared one-step errors are
+    # picked from the ALPHAS x BETAS x GAMMAS grid.
+    name = "Holt-Winters (ETS)"
+
+    def _fit(self, y):
+        n_series, n_obs = y.shape
+        m = self.m = self._season(n_obs)
+        alpha, beta, gamma = (grid.ravel() for grid in np.meshgrid(ALPHAS, BETAS, GAMMAS if m > 1 else [0.0]))
+        keep = (beta <= alpha) & (gamma <= 1 - alpha)
+        alpha, beta, gamma = alpha[keep], beta[keep], gamma[keep]
+
+        # Initial states from the first two seasons (first two points without seasonality)
+        if m > 1:
+            level = y[:, :m].mean(axis=1)
+            trend = (y[:, m:2 * m].mean(axis=1) - level) / m
+            season = y[:, :m] - level[:, None]
+        else:
+            level = y[:, 0]
+            trend = y[:, 1] - y[:, 0]
+            season = np.zeros((n_series, 1))
+
+        # (series, candidate) states, updated for all candidates at once
+        n_candidates = len(alpha)
+        sse = _holt_winters_pass(y, m, np.repeat(level[:, None], n_candidates, axis=1),
+                                 np.repeat(trend[:, None], n_candidates, axis=1),
+                                 np.repeat(season[:, None, :], n_candidates, axis=1), alpha, beta, gamma)[3]
+        best = np.argmin(sse, axis=1)
+        self.alpha, self.beta, self.gamma = alpha[best], beta[best], gamma[best]
+
+        # Again with only the chosen parameters, keeping the one-step errors
+        level, trend, season, sse, errors = _holt_winters_pass(
+            y, m, level[:, None], trend[:, None], season[:, None, :],
+            self.alpha[:, None], self.beta[:, None], self.gamma[:, None], keep_errors=True)
+        self.level, self.trend, self.season = level[:, 0], trend[:, 0], season[:, 0]
+        self.errors = errors[:, 0]
+        self.n_obs = n_obs
+        n_params = 3 + (m > 1)
+        self.sigma = np.sqrt(sse[:, 0] / max(n_obs - n_params, 1))
+
+    def _forecast(self, steps):
+        h = np.arange(1, steps + 1)
+        slots = (self.n_obs + h - 1) % self.m
+        return self.level[:, None] + self.trend[:, None] * h + self.season[:, slots]
+
+    def _forecast_sd(self, steps):
+        # var_h = sigma^2 (1 + sum_{j<h} c_j^2), c_j = alpha + beta j + gamma [j = 0 mod m]
+        j = np.arange(1, steps)
+        c = self.alpha[:, None] + self.beta[:, None] * j
+        if self.m > 1:
+            c = c + self.gamma[:, None] * (j % self.m == 0)
+        cumulative = np.concatenate([np.zeros((len(c), 1)), np.cumsum(c ** 2, axis=1)], axis=1)
+        return self.sigma[:, None] * np.sqrt(1 + cumulative)
+
+
+def _holt_winters_pass(y, m, level, trend, season, alpha, beta, gamma, keep_errors=False):
+    # One pass of the Holt-Winters recursions over time for (series, candidate)
+    # states; returns the final states, the sum of squared one-step errors and,
+    # with keep_errors, the (series, candidate, month) errors themselves
+    season = season.copy()
+    sse = np.zeros(level.shape)
+    kept = np.empty(level.shape + (y.shape[1],)) if keep_errors else None
+    for t in range(y.shape[1]):
+        slot = t % m
+        errors = y[:, t, None] - (level + trend + season[:, :, slot])
+        sse += errors ** 2
+        if keep_errors:
+            kept[:, :, t] = errors
+        level = level + trend + alpha * errors
+        trend = trend + beta * errors
+        season[:, :, slot] += gamma * errors
+    return level, trend, season, sse, kept
+
+
+def seasonal_indices(y, m):
+    # Additive seasonal indices (one per position in the season, summing to
+    # zero) of a classical decomposition with a centred moving average
+    weights = np.ones(m + 1 - m % 2)
+    if m % 2 == 0:
+        weights[[0, -1]] = 0.5
+    weights /= m
+    windows = np.lib.stride_tricks.sliding_window_view(y, len(weights), axis=1)
+    trend = np.full(y.shape, np.nan)
+    half = len(weights) // 2
+    trend[:, half:y.shape[1] - half] = windows @ weights
+    detrended = y - trend
+    positions = np.arange(y.shape[1]) % m
+    indices = np.stack([np.nanmean(detrended[:, positions == slot], axis=1) for slot in range(m)], axis=1)
+    return indices - indices.mean(axis=1, keepdims=True)
+
+
+class Theta(Forecaster):
+    # Theta method (Hyndman & Billah's form): simple exponential smoothing
+    # plus half the slope of the linear trend, on the seasonally adjusted series
+    name = "Theta"
+
+    def _fit(self, y):
+        n_series, n_obs = y.shape
+        self.m = self._season(n_obs)
+        self.indices = seasonal_indices(y, self.m) if self.m > 1 else np.zeros((n_series, 1))
+        adjusted = y - self.indices[:, np.arange(n_obs) % self.m]
+
+        # Simple exponential smoothing for every alpha at once
+        level = np.repeat(adjusted[:, :1], len(ALPHAS), axis=1)
+        sse = np.zeros((n_series, len(ALPHAS)))
+        for t in range(1, n_obs):
+            errors = adjusted[:, t, None] - level
+            sse += errors ** 2
+            level = level + ALPHAS * errors
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(n_series)
+        self.alpha = ALPHAS[best]
+        self.level = level[rows, best]
+        self.sigma = np.sqrt(sse[rows, best] / max(n_obs - 2, 1))
+
+        # One-step errors of the chosen alpha (the adjusted series' errors are
+        # the original series' errors, the seasonal indices being fixed)
+        self.errors = np.full((n_series, n_obs), np.nan)
+        level = adjusted[:, 0]
+        for t in range(1, n_obs):
+            self.errors[:, t] = adjusted[:, t] - level
+            level = level + self.alpha * self.errors[:, t]
+
+        # Slope of the least-squares line through the adjusted series
+        t = np.arange(n_obs) - (n_obs - 1) / 2
+        self.slope = (adjusted - adjusted.mean(axis=1, keepdims=True)) @ t / (t @ t)
+        self.n_obs = n_obs
+
+    def _forecast(self, steps):
+        h = np.arange(1, steps + 1)
+        alpha = self.alpha[:, None]
+        drift = self.slope[:, None] / 2 * ((h - 1) + 1 / alpha - (1 - alpha) ** self.n_obs / alpha)
+        return self.level[:, None] + drift + self.indices[:, (self.n_obs + h - 1) % self.m]
+
+    def _forecast_sd(self, steps):
+        h = np.arange(1, steps + 1)
+        return self.sigma[:, None] * np.sqrt(1 + (h - 1) * self.alpha[:, None] ** 2)
+
+
+class Sarima(Forecaster):
+    # SARIMA through sarima.py: an order search per series, then the best
+    # model's forecasts, or a fit of fixed orders if `order` is given. Much
+    # slower than the engines above. A series whose fit fails forecasts NaN.
+    name = "SARIMA"
+
+    def __init__(self, seasonal_periods=12, seasonal_d=None, method=None, workers=None,
+                 order=None, seasonal_order=None):
+        import sarima
+
+        super().__init__(seasonal_periods)
+        self.seasonal_d = sarima.DEFAULT_SEASONAL_D if seasonal_d is None else seasonal_d
+        self.method = sarima.DEFAULT_METHOD if method is None else method
+        self.workers = workers
+        self.order = order
+        self.seasonal_order = seasonal_order
+
+    @classmethod
+    def from_results(cls, results, seasonal_periods=12):
+        # Wrap an already fitted SARIMAXResults
+        engine = cls(seasonal_periods)
+        engine._one_series = True
+        engine.results = [results]
+        return engine
+
+    def _fit(self, y):
+        import sarima
+
+        if self.order is not None:
+            self.results = [sarima.fit_candidate(row, self.order, self.seasonal_order)[0] for row in y]
+        else:
+            self.results = [sarima.search(row, self.seasonal_d, self.seasonal_periods, self.method, self.workers).best_model
+                            for row in y]
+        self.n_obs = y.shape[1]
+        self.errors = np.stack([np.full(self.n_obs, np.nan) if results is None else np.asarray(results.resid, dtype=float)
+                                for results in self.results])
+
+    def _forecasts(self, steps, attribute):
+        rows = []
+        for results in self.results:
+            if results is None:
+                rows.append(np.full(steps, np.nan))
+            else:
+                rows.append(np.asarray(getattr(results.get_forecast(steps), attribute), dtype=float))
+        return np.stack(rows)
+
+    def _forecast(self, steps):
+        return self._forecasts(steps, "predicted_mean")
+
+    def _forecast_sd(self, steps):
+        return np.sqrt(self._forecasts(steps, "var_pred_mean"))
+
+
+ENGINES = {engine.name: engine for engine in (HoltWinters, Theta, SeasonalNaive, Drift, Sarima)}
+DEFAULT_ENGINE = HoltWinters.name
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    # An engine by name, for backtests and batch runs
+    engine: str
+    order: tuple = None  # SARIMA only: fixed orders instead of an order search
+    seasonal_order: tuple = None
+
+    @property
+    def label(self):
+        if self.order is None:
+            return self.engine
+        return f"{self.engine}{self.order}{self.seasonal_order}".replace(" ", "")
+
+    @classmethod
+    def parse(cls, text):
+        # "Theta", "SARIMA" or "SARIMA(p,d,q)(P,D,Q,s)"
+        match = re.fullmatch(r"SARIMA\((\d+),(\d+),(\d+)\)\((\d+),(\d+),(\d+),(\d+)\)", text.replace(" ", ""))
+        if match:
+            numbers = tuple(int(group) for group in match.groups())
+            return cls("SARIMA", numbers[:3], numbers[3:])
+        if text not in ENGINES:
+            raise ValueError(f"Unknown model {text!r}; expected one of {', '.join(ENGINES)} or SARIMA(p,d,q)(P,D,Q,s)")
+        return cls(text)
+
+    def make(self, seasonal_periods=12, workers=None):
+        # Unfitted engine for this spec
+        if self.engine == "SARIMA":
+            return Sarima(seasonal_periods, workers=workers, order=self.order, seasonal_order=self.seasonal_order)
+        return ENGINES[self.engine](seasonal_periods)
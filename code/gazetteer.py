@@ -0,0 +1,60 @@
+# Offline county gazetteer: FIPS code, county name, state and centroid.
+#
+# data/county_centroids.csv holds one row per county, with the centroid
+# computed from the U.S. Census Bureau cartographic boundary file
+# (cb_2016_us_county_500k). The location dataset is joined to it on the FIPS
+# code in the 'County' column, so the map needs no network geocoding.
+import pandas as pd
+import streamlit as st
+
+from geocache import resolve_locations
+from ingest import DATA_DIR
+
+CENTROIDS_PATH = DATA_DIR / "county_centroids.csv"
+
+
+@st.cache_resource(show_spinner=False)
+def load_centroids():
+    centroids = pd.read_csv(CENTROIDS_PATH, dtype={"fips": str})
+    return centroids.rename(columns={"lat": "Latitude", "lon": "Longitude"})
+
+
+def fips_codes(df):
+    # 'County' is read as a number, so leading zeros are lost ("2188" -> "02188")
+    return df['County'].astype(str).str.zfill(5)
+
+
+def is_place(fips):
+    # "[Texas, county not reported]" rows (FIPS xx999) aren't places
+    return ~fips.str.endswith("999")
+
+
+def unplaced_counties(df):
+    # Names of real counties the table doesn't have (these go to the geocoder)
+    fips = fips_codes(df)
+    unplaced = ~fips.isin(set(load_centroids()["fips"])) & is_place(fips)
+    return df.loc[unplaced, "County Name"].astype(str).tolist()
+
+
+def attach_centroids(df, geocode_missing=False):
+    # Join county centroids to a location frame in one merge.
+    # Returns (rows with 'Latitude'/'Longitude', county names not in the table)
+    #
+    # With geocode_missing=True, counties the table doesn't have are looked up
+    # through the cached geocoder (geocache.py) before giving up on them.
+    centroids = load_centroids()[["fips", "Latitude", "Longitude"]]
+    merged = df.assign(fips=fips_codes(df)).merge(centroids, on="fips", how="left", indicator=True)
+
+    unmatched = merged["_merge"] == "left_only"
+    if geocode_missing and unmatched.any():
+        lookup = unmatched & is_place(merged["fips"])
+        if lookup.any():
+            names = merged.loc[lookup, "County Name"].astype(str)
+            coords = names.map(resolve_locations(names)).dropna()
+            merged.loc[coords.index, "Latitude"] = coords.str[0]
+            merged.loc[coords.index, "Longitude"] = coords.str[1]
+            unmatched = merged["Latitude"].isna()
+
+    located = merged[~unmatched].drop(columns=["fips", "_merge"])
+    missing_locations = merged.loc[unmatched, "County Name"].tolist()
+    return located, missing_locations
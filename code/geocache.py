@@ -0,0 +1,179 @@
+# Persistent geocode cache with concurrent, rate-limited lookups.
+#
+# Used for county names the offline gazetteer can't place. Every answer is
+# stored in SQLite, including "not found" and failed lookups (negative
+# entries), which expire after a TTL so they are retried eventually; expired
+# ones are deleted whenever the cache is opened (once per process). Cache
+# misses are fetched on a small thread pool; a shared token bucket keeps the
+# request rate within the geocoding service's limit.
+#
+# The geocoder is Nominatim by default. Point it at another server (for
+# example geocode_stub_server.py) with environment variables:
+#   GEOCODER_DOMAIN=localhost:8088 GEOCODER_SCHEME=http GEOCODER_RATE=20
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ingest import CACHE_DIR
+
+GEOCODE_DB_PATH = CACHE_DIR / "geocode.sqlite"
+
+# How long negative entries are kept before the lookup is tried again
+NOT_FOUND_TTL = 7 * 24 * 3600  # the service answered, but had no match
+ERROR_TTL = 3600  # network error, timeout, rate limit, ...
+
+FOUND = "found"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+
+class GeocodeCache:
+    # SQLite table of query -> (latitude, longitude, status, fetched_at)
+
+    def __init__(self, path=GEOCODE_DB_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode (
+                    query TEXT PRIMARY KEY,
+                    latitude REAL,
+                    longitude REAL,
+                    status TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+        self.prune()
+
+    def _connect(self):
+        # One short-lived connection per call, so the cache can be used from
+        # any thread or Streamlit session
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get_many(self, queries, now=None):
+        # Cached answers that haven't expired: query -> (lat, lon) or None
+        now = time.time() if now is None else now
+        queries = list(dict.fromkeys(queries))
+        answers = {}
+        with self._connect() as conn:
+            for start in range(0, len(queries), 500):
+                chunk = queries[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT query, latitude, longitude, status, fetched_at FROM geocode WHERE query IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for query, lat, lon, status, fetched_at in rows:
+                    if status == FOUND:
+                        answers[query] = (lat, lon)
+                    elif now - fetched_at < (NOT_FOUND_TTL if status == NOT_FOUND else ERROR_TTL):
+                        answers[query] = None
+        return answers
+
+    def put_many(self, entries, now=None):
+        # entries: iterable of (query, (lat, lon) or None, status)
+        now = time.time() if now is None else now
+        rows = []
+        for query, location, status in entries:
+            lat, lon = location if location else (None, None)
+            rows.append((query, lat, lon, status, now))
+        with self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)", rows)
+
+    def prune(self, now=None):
+        # Drop expired negative entries; returns how many
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM geocode WHERE (status = ? AND fetched_at < ?) OR (status = ? AND fetched_at < ?)",
+                (NOT_FOUND, now - NOT_FOUND_TTL, ERROR, now - ERROR_TTL),
+            ).rowcount
+
+
+class TokenBucket:
+    # Thread-safe token bucket: `rate` requests per second, bursts of `capacity`
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Block until a token is available, then take it
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_geocoder():
+    # geopy Nominatim, or a compatible server given by GEOCODER_DOMAIN/SCHEME
+    from geopy.geocoders import Nominatim
+
+    return Nominatim(
+        user_agent="my_job_postings_app",
+        domain=os.environ.get("GEOCODER_DOMAIN", "nominatim.openstreetmap.org"),
+        scheme=os.environ.get("GEOCODER_SCHEME", "https"),
+        timeout=float(os.environ.get("GEOCODER_TIMEOUT", "5")),
+    )
+
+
+# Shared by every session in the process so the rate limit is global.
+# Nominatim's public usage policy allows one request per second.
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def _default_geocode():
+    with _shared_lock:
+        if "geocode" not in _shared:
+            geocoder = make_geocoder()
+            _shared["geocode"] = geocoder.geocode
+            _shared["bucket"] = TokenBucket(float(os.environ.get("GEOCODER_RATE", "1")))
+            _shared["cache"] = GeocodeCache()
+        return _shared["geocode"], _shared["bucket"], _shared["cache"]
+
+
+def _lookup(geocode, bucket, query):
+    bucket.acquire()
+    try:
+        location = geocode(query)
+    except Exception:
+        return query, None, ERROR
+    if location is None:
+        return query, None, NOT_FOUND
+    return query, (location.latitude, location.longitude), FOUND
+
+
+def resolve_locations(queries, geocode=None, bucket=None, cache=None, max_workers=4):
+    # Resolve place names to (lat, lon), or None if they can't be located.
+    # Cached answers are used first; the misses are looked up concurrently.
+    if geocode is None or bucket is None or cache is None:
+        default_geocode, default_bucket, default_cache = _default_geocode()
+        geocode = geocode or default_geocode
+        bucket = bucket or default_bucket
+        cache = cache or default_cache
+
+    queries = list(dict.fromkeys(queries))
+    answers = cache.get_many(queries)
+    misses = [query for query in queries if query not in answers]
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as pool:
+            results = list(pool.map(lambda query: _lookup(geocode, bucket, query), misses))
+        cache.put_many(results)
+        for query, location, status in results:
+            answers[query] = location
+
+    return {query: answers[query] for query in queries}
@@ -0,0 +1,93 @@
+# Local stand-in for the Nominatim geocoder, for testing geocache.py offline.
+#
+# Answers /search?q=<county name>&format=json with the centroid from the
+# bundled gazetteer or from UNPLACED below (or an empty list), in the same
+# JSON shape as Nominatim.
+#
+# Run this in the Terminal, then point the dashboard at it:
+#   python code/geocode_stub_server.py --port 8088 --delay 0.2
+#   GEOCODER_DOMAIN=localhost:8088 GEOCODER_SCHEME=http GEOCODER_RATE=20 streamlit run code/data_to_web.py
+import argparse
+import csv
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from gazetteer import CENTROIDS_PATH
+
+# Counties of the location workbook the gazetteer can't place (Connecticut's
+# planning regions replaced its counties after the 2016 boundary file), with
+# approximate centroids. These are the names attach_centroids() sends to the
+# geocoder, so with them the stand-in also exercises successful lookups and
+# their cache entries, not only "not found".
+UNPLACED = {
+    "Capitol Planning Region, CT": (41.78, -72.63),
+    "Greater Bridgeport Planning Region, CT": (41.22, -73.22),
+    "Lower Connecticut River Valley Planning Region, CT": (41.45, -72.50),
+    "Naugatuck Valley Planning Region, CT": (41.52, -73.08),
+    "Northeastern Connecticut Planning Region, CT": (41.85, -71.98),
+    "Northwest Hills Planning Region, CT": (41.82, -73.22),
+    "South Central Connecticut Planning Region, CT": (41.33, -72.90),
+    "Southeastern Connecticut Planning Region, CT": (41.45, -72.10),
+    "Western Connecticut Planning Region, CT": (41.35, -73.42),
+}
+
+
+def load_places():
+    with open(CENTROIDS_PATH, newline="") as f:
+        places = {row["county_name"].lower(): row for row in csv.DictReader(f)}
+    for name, (lat, lon) in UNPLACED.items():
+        places[name.lower()] = {"lat": str(lat), "lon": str(lon), "county_name": name}
+    return places
+
+
+def make_handler(places, delay):
+    class Handler(BaseHTTPRequestHandler):
+        requests_served = 0
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/search":
+                self.send_error(404)
+                return
+            Handler.requests_served += 1
+            time.sleep(delay)  # simulate network latency
+
+            query = parse_qs(url.query).get("q", [""])[0].strip().lower()
+            place = places.get(query)
+            results = []
+            if place:
+                results.append({
+                    "lat": place["lat"],
+                    "lon": place["lon"],
+                    "display_name": place["county_name"],
+                })
+
+            body = json.dumps(results).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(port=0, delay=0.0):
+    # port=0 picks a free port; the bound port is server.server_address[1]
+    return ThreadingHTTPServer(("127.0.0.1", port), make_handler(load_places(), delay))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in geocoder")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each answer")
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.delay)
+    print(f"Stand-in geocoder on http://127.0.0.1:{server.server_address[1]}/search")
+    server.serve_forever()
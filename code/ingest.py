@@ -0,0 +1,173 @@
+# Ingest step: compile the Excel workbooks in data/ into typed Parquet files.
+#
+# Parsing the .xls files with xlrd is slow, so each sheet the dashboard uses is
+# cleaned once and written to data/cache/ as Parquet. The cache file name
+# carries a hash of the source workbook, so a sheet is only parsed again when
+# the workbook itself changes.
+#
+# Run this in the Terminal to build the cache ahead of time:
+#   python code/ingest.py
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from normalize import normalize_locations
+from xls_reader import read_sheet
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_DIR = DATA_DIR / "cache"
+
+# Bump this whenever a cleaning function below changes, so old Parquet files
+# are not reused with the new code.
+CACHE_VERSION = 3
+
+
+# --- Cleaning for each sheet (same steps the pages used to do by hand) ---
+def clean_companies(df):
+    # Clean 'Median Posting Duration' ("25 days" -> 25)
+    df['Median Posting Duration'] = df['Median Posting Duration'].str.extract(r'(\d+)').astype(int)
+    return df
+
+
+def clean_locations(df):
+    # Clean the county names
+    df['County Name'] = df['County Name'].str.strip()
+
+    # Clean numeric columns ("Insf. Data" -> NaN)
+    df['Median Annual Advertised Salary'] = pd.to_numeric(df['Median Annual Advertised Salary'], errors='coerce')
+    df['Posting Concentration'] = pd.to_numeric(df['Posting Concentration'], errors='coerce')
+
+    # Handle missing values or errors
+    df = df.dropna(subset=['Median Annual Advertised Salary'])
+    return df.reset_index(drop=True)
+
+
+def clean_timeseries(df):
+    df = df.dropna(subset=["Month"])
+    df["Month"] = pd.to_datetime(df["Month"], format="%b %Y")
+    df["Unique Postings"] = pd.to_numeric(df["Unique Postings"], errors="coerce")
+    df = df.sort_values("Month").reset_index(drop=True)
+    return df
+
+
+# Every sheet used by the dashboard: source workbook, sheet name, header offset,
+# the cleaning applied before the frame is cached and an optional normalization
+# stage (compact dtypes, derived columns; see normalize.py).
+SOURCES = {
+    "companies": {
+        "file": "Program_Overview_6046.xls",
+        "sheet": "Job Postings Top Companies",
+        "skiprows": 2,
+        "clean": clean_companies,
+    },
+    "locations": {
+        "file": "Job_Postings_by_Location_STEM_Occupations_SOC_2021_in_3194_Counties_8653.xls",
+        "sheet": "Job Postings by Location",
+        "skiprows": 0,
+        "clean": clean_locations,
+        "normalize": normalize_locations,
+    },
+    "timeseries": {
+        "file": "Job_Posting_Analytics_8_Occupations_in_3194_Counties_5318.xls",
+        "sheet": "Job Postings Timeseries",
+        "skiprows": 2,
+        "clean": clean_timeseries,
+    },
+}
+
+
+def file_hash(path):
+    # SHA-256 of the file contents, read in blocks
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_path(name):
+    return DATA_DIR / SOURCES[name]["file"]
+
+
+# Workbook hashes by path, with the (mtime_ns, size) they were computed for
+_source_hashes = {}
+
+
+def source_key(name):
+    # Cache key of a dataset: source workbook hash plus the cache version.
+    # Pages call this on every rerun, so the workbook is only hashed again
+    # when its modification time or size changes; otherwise it costs a stat()
+    path = source_path(name)
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _source_hashes.get(path)
+    if cached is None or cached[0] != signature:
+        cached = _source_hashes[path] = (signature, file_hash(path))
+    return f"{cached[1][:16]}-v{CACHE_VERSION}"
+
+
+def cache_path(name, key=None):
+    if key is None:
+        key = source_key(name)
+    return CACHE_DIR / f"{name}-{key}.parquet"
+
+
+def read_source(name):
+    # Read one sheet straight from the Excel workbook (only that sheet is decoded)
+    source = SOURCES[name]
+    return read_sheet(source_path(name), source["sheet"], skiprows=source["skiprows"])
+
+
+def parse_source(name):
+    # Read, clean and normalize one sheet
+    source = SOURCES[name]
+    df = source["clean"](read_source(name))
+    if "normalize" in source:
+        df = source["normalize"](df)
+    return df
+
+
+def write_parquet(df, path):
+    # Write to a temporary file first so a concurrent reader never sees a
+    # half-written Parquet file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(name):
+    return cache_path(name).exists()
+
+
+def ingest(name, force=False):
+    # Compile one dataset into the cache; returns the Parquet path
+    path = cache_path(name)
+    if path.exists() and not force:
+        return path
+
+    write_parquet(parse_source(name), path)
+
+    # Remove Parquet files built from older versions of the workbook
+    for old in CACHE_DIR.glob(f"{name}-*.parquet"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def load_dataset(name):
+    # Load a cleaned dataset, re-parsing the workbook only if it changed
+    return pd.read_parquet(ingest(name))
+
+
+def ingest_all(force=False):
+    return {name: ingest(name, force=force) for name in SOURCES}
+
+
+if __name__ == "__main__":
+    force = "--force" in sys.argv[1:]
+    for name, path in ingest_all(force=force).items():
+        print(f"{name:<12} {path.relative_to(DATA_DIR.parent)}")
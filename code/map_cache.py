@@ -0,0 +1,236 @@
+# County maps of the location page, and their cache.
+#
+# A map is built in bulk: the county markers are one FastMarkerCluster whose
+# data is a single array of [lat, lon, county, salary, postings, duration]
+# rows, and the browser creates the markers and fills in their popups from a
+# JavaScript template (MARKER_CALLBACK), instead of folium emitting a Marker,
+# Popup and Icon per county. That keeps the national map of every county
+# (NATIONAL) small and quick to build; see benchmarks/bench_map_layer.py.
+# Counties can also be shaded by a metric (CHOROPLETH_METRICS), drawn from
+# the bundled, pre-simplified county boundaries of county_shapes.py; a state's
+# map is then fitted to the state.
+#
+# Building a map and rendering it to HTML is still the slowest part of the
+# page, and the result only depends on the located rows and the map options.
+# The HTML is therefore cached under a content hash of exactly those inputs (plus
+# MAP_VERSION, to bump when the map code changes): in memory, shared by all
+# sessions, and on disk in data/cache/maps/, so that a restarted server or
+# another process doesn't build it again. The disk cache is capped in size
+# (MAP_CACHE_MB, 64 MB by default); the least recently used maps go first.
+#
+# Run this in the Terminal to build every map ahead of time (also
+# done by prewarm.py):
+#   python code/map_cache.py [--force]
+import hashlib
+import json
+import os
+import sys
+import time
+
+import folium
+import pandas as pd
+import streamlit as st
+from folium.plugins import FastMarkerCluster, HeatMap
+
+import county_shapes
+from gazetteer import fips_codes
+from ingest import CACHE_DIR
+from state_index import DURATION_COL, POSTINGS_COL, SALARY_COL
+
+MAPS_DIR = CACHE_DIR / "maps"
+MAX_BYTES = int(float(os.environ.get("MAP_CACHE_MB", 64)) * 1024 * 1024)
+MEMORY_ENTRIES = 64  # maps kept in memory
+MAP_VERSION = 3
+
+NATIONAL = "US"  # map of every county instead of a state's
+DEFAULT_OPTIONS = {"markers": True, "heatmap": True, "choropleth": None}
+# Columns of the located rows that end up in the map
+MAP_COLUMNS = ['County', 'County Name', 'Latitude', 'Longitude', SALARY_COL, POSTINGS_COL, DURATION_COL]
+# Column -> (label, color scheme, value format) of the choropleth
+CHOROPLETH_METRICS = {
+    SALARY_COL: ("Median Salary", "YlGn", "${:,.0f}"),
+    POSTINGS_COL: ("Unique Postings", "YlOrRd", "{:,.0f}"),
+    DURATION_COL: ("Median Posting Duration", "PuBu", "{:.0f} days"),
+}
+
+# Marker of one row of marker_rows(), with its popup, made in the browser
+MARKER_CALLBACK = """function (row) {
+    var popup = L.popup({maxWidth: 300}).setContent(
+        "<b>County:</b> " + row[2] + "<br>" +
+        "<b>Median Salary:</b> $" + row[3] + "<br>" +
+        "<b>Unique Postings:</b> " + row[4] + "<br>" +
+        "<b>Median Posting Duration:</b> " + row[5] + " days");
+    return L.marker(new L.LatLng(row[0], row[1])).bindPopup(popup);
+}"""
+
+
+def marker_rows(located_df):
+    # [[lat, lon, county, salary, postings, duration]] as plain Python values,
+    # built column by column; coordinates rounded to about a metre
+    columns = [
+        located_df['Latitude'].round(5), located_df['Longitude'].round(5), located_df['County Name'],
+        located_df[SALARY_COL], located_df[POSTINGS_COL], located_df[DURATION_COL],
+    ]
+    return [list(row) for row in zip(*(column.tolist() for column in columns))]
+
+
+def add_choropleth(map_obj, located_df, column, zoom=None):
+    # Counties shaded by `column`, with their boundaries simplified for `zoom`
+    # (or for the zoom that fits them); returns the counties' bounds, None if
+    # there are no boundaries for them
+    fips = fips_codes(located_df)
+    topology, bounds, zoom = county_shapes.state_topology(fips, zoom)
+    if bounds is None:
+        return None
+    label, colors, value_format = CHOROPLETH_METRICS[column]
+    values = dict(zip(fips, located_df[column]))
+    for geometry in topology["objects"]["counties"]["geometries"]:
+        geometry["properties"]["value"] = value_format.format(values[geometry["id"]])
+
+    choropleth = folium.Choropleth(
+        geo_data=topology, topojson="objects.counties", data=pd.DataFrame({"fips": fips, "value": located_df[column]}),
+        columns=["fips", "value"], key_on="feature.id", fill_color=colors, fill_opacity=0.7,
+        line_weight=0.5, line_opacity=0.4, nan_fill_color="lightgray", legend_name=label, highlight=True,
+    )
+    folium.GeoJsonTooltip(fields=["name", "value"], aliases=["County", label]).add_to(choropleth.geojson)
+    choropleth.add_to(map_obj)
+    return bounds
+
+
+def build_map_html(located_df, options=DEFAULT_OPTIONS, zoom_start=5, fit=False):
+    # Folium map of the located counties, rendered to HTML; with `fit`, a
+    # choropleth map is fitted to its counties
+    map_center = [37.0902, -95.7129]  # Approximate center of the US
+    map_obj = folium.Map(location=map_center, zoom_start=zoom_start)
+
+    if options["choropleth"]:
+        bounds = add_choropleth(map_obj, located_df, options["choropleth"], None if fit else zoom_start)
+        if fit and bounds is not None:
+            map_obj.fit_bounds(bounds)
+
+    if options["markers"]:
+        FastMarkerCluster(marker_rows(located_df), callback=MARKER_CALLBACK).add_to(map_obj)
+
+    if options["heatmap"]:
+        # Weighted by median salary
+        heat_data = located_df[['Latitude', 'Longitude', SALARY_COL]].round(5).to_numpy().tolist()
+        HeatMap(heat_data).add_to(map_obj)
+
+    # The whole page rather than _repr_html_()'s iframe with the page escaped
+    # into its srcdoc: components.html already puts it in an iframe
+    return map_obj.get_root().render()
+
+
+def map_key(state, located_df, options=DEFAULT_OPTIONS):
+    # Content hash of everything the map is built from
+    digest = hashlib.sha256()
+    digest.update(json.dumps([MAP_VERSION, state, options], sort_keys=True).encode())
+    if options["choropleth"]:
+        # The boundary files, in case they were rebuilt
+        for zoom in county_shapes.ZOOM_LEVELS:
+            stat = county_shapes.topology_path(zoom).stat()
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    digest.update(pd.util.hash_pandas_object(located_df[MAP_COLUMNS], index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:32]
+
+
+def map_path(key):
+    return MAPS_DIR / f"{key}.html"
+
+
+def _read(key):
+    path = map_path(key)
+    try:
+        html = path.read_text(encoding="utf-8")
+        os.utime(path)  # last used, for pruning
+    except OSError:
+        return None
+    return html
+
+
+def _write(key, html):
+    # Atomic, like the Parquet cache, then prune down to the size cap
+    path = map_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(html, encoding="utf-8")
+    os.replace(tmp_path, path)
+    prune(keep=key)
+
+
+def prune(max_bytes=MAX_BYTES, keep=None):
+    # Remove the least recently used maps until the cache fits in max_bytes
+    listing = []
+    for path in MAPS_DIR.glob("*.html"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # removed by a concurrent prune
+        listing.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in listing)
+    for _, size, path in sorted(listing):
+        if total <= max_bytes:
+            break
+        if path.stem != keep:
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+def _build(state, located_df, options):
+    if state == NATIONAL:
+        return build_map_html(located_df, options, zoom_start=4)
+    return build_map_html(located_df, options, fit=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=MEMORY_ENTRIES)
+def _cached_html(key, _state, _located_df, _options):
+    # Shared by all sessions; only the key is hashed
+    html = _read(key)
+    if html is None:
+        html = _build(_state, _located_df, _options)
+        _write(key, html)
+    return html
+
+
+def get_map_html(state, located_df, options=DEFAULT_OPTIONS):
+    # The map HTML of a state (or NATIONAL): from memory, from disk, or built
+    # and stored
+    located_df = located_df[MAP_COLUMNS]
+    return _cached_html(map_key(state, located_df, options), state, located_df, options)
+
+
+def is_fresh(options=DEFAULT_OPTIONS):
+    # Every state's map is on disk
+    return all(map_path(map_key(state, located_df, options)).exists() for state, located_df in _located_states())
+
+
+def build_all(options=DEFAULT_OPTIONS, log=None, force=False):
+    # Build the missing maps (all of them with force) of every state and the
+    # national one; returns the number built
+    built = 0
+    for state, located_df in _located_states():
+        start = time.perf_counter()
+        located_df = located_df[MAP_COLUMNS]
+        key = map_key(state, located_df, options)
+        if force or not map_path(key).exists():
+            _write(key, _build(state, located_df, options))
+            built += 1
+            if log:
+                log(f"{state:<4} {len(located_df):>4} counties {time.perf_counter() - start:6.2f} s")
+    return built
+
+
+def _located_states():
+    from datasets import get_dataset
+    from gazetteer import attach_centroids
+    from state_index import get_state_index
+
+    for state, entry in get_state_index().items():
+        yield state, attach_centroids(entry.rows, geocode_missing=True)[0]
+    yield NATIONAL, attach_centroids(get_dataset("locations"), geocode_missing=True)[0]
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    build_all(log=print, force="--force" in sys.argv[1:])
+    print(f"{time.perf_counter() - start:.2f} s")
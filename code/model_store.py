@@ -0,0 +1,127 @@
+# Persistent store of fitted SARIMA models.
+#
+# Each entry is a small JSON file in data/cache/forecast/models/ named
+# "<series fingerprint>-<spec hash>.json". It holds the model spec and the
+# fitted parameter vector (not the pickled SARIMAXResults), so a model is
+# reloaded with SARIMAX(...).filter(params) instead of being fitted again.
+# Search entries also keep the search's fit records (see sarima.py).
+#
+# The store is capped in size (MODEL_STORE_MB, 64 MB by default); the least
+# recently used entries are evicted first. Loading an entry marks it used.
+#
+# Run this in the Terminal to look at or clean up the store:
+#   python code/model_store.py list
+#   python code/model_store.py prune [--max-mb N] [--older-than DAYS] [--all]
+import json
+import os
+import sys
+import time
+
+from ingest import CACHE_DIR
+
+MODELS_DIR = CACHE_DIR / "forecast" / "models"
+MAX_BYTES = int(float(os.environ.get("MODEL_STORE_MB", 64)) * 1024 * 1024)
+
+
+class ModelStore:
+    def __init__(self, root=None, max_bytes=MAX_BYTES):
+        self.root = MODELS_DIR if root is None else root
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return self.root / f"{key}.json"
+
+    def __contains__(self, key):
+        return self.path(key).exists()
+
+    def get(self, key, touch=True):
+        # Entry for `key` (a dict), or None if missing or unreadable
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if touch:
+                os.utime(path)  # last used, for eviction
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key, entry):
+        # Write atomically, then evict down to the size cap
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {**entry, "key": key, "saved_at": time.time()}
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.prune(keep=key)
+        return path
+
+    def entries(self):
+        # [(key, bytes, last_used)] of every entry, least recently used first
+        if not self.root.exists():
+            return []
+        listing = []
+        for path in self.root.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue  # removed by a concurrent prune
+            listing.append((path.stem, stat.st_size, stat.st_mtime))
+        return sorted(listing, key=lambda item: item[2])
+
+    def prune(self, max_bytes=None, older_than=None, keep=None, now=None):
+        # Remove entries unused for `older_than` seconds, then the least
+        # recently used ones until the store fits in `max_bytes`. Returns the
+        # removed keys.
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        now = time.time() if now is None else now
+        listing = self.entries()
+        total = sum(size for _, size, _ in listing)
+        removed = []
+        for key, size, last_used in listing:
+            expired = older_than is not None and now - last_used > older_than
+            if key == keep or not (expired or total > max_bytes):
+                continue
+            self.path(key).unlink(missing_ok=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+
+def _print_entries(store):
+    listing = store.entries()
+    print(f"{'key':<42} {'kind':<7} {'model':<28} {'AIC':>10} {'KB':>6}  last used")
+    for key, size, last_used in reversed(listing):
+        entry = store.get(key, touch=False) or {}
+        model = entry.get("model") or {}  # null for a search where no fit succeeded
+        spec = f"{tuple(model.get('order', ()))}{tuple(model.get('seasonal_order', ()))}"
+        aic = model.get("aic")
+        print(f"{key:<42} {entry.get('kind', '?'):<7} {spec:<28} "
+              f"{aic if aic is None else round(aic, 3)!s:>10} {size / 1024:>6.1f}  "
+              f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(last_used))}")
+    total = sum(size for _, size, _ in listing)
+    print(f"{len(listing)} entries, {total / 1024:.1f} KB (cap {store.max_bytes / 1024 / 1024:.0f} MB)")
+
+
+def _option(args, name, default=None):
+    if name in args:
+        return float(args[args.index(name) + 1])
+    return default
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    store = ModelStore()
+    if args and args[0] == "prune":
+        if "--all" in args:
+            removed = store.prune(max_bytes=0)
+        else:
+            max_mb = _option(args, "--max-mb")
+            days = _option(args, "--older-than")
+            removed = store.prune(max_bytes=None if max_mb is None else int(max_mb * 1024 * 1024),
+                                  older_than=None if days is None else days * 24 * 3600)
+        print(f"Removed {len(removed)} entries")
+    else:
+        _print_entries(store)
@@ -0,0 +1,115 @@
+# Normalization stage: compact dtypes for the location frame.
+#
+# County and state names are stored as categoricals and numeric columns are
+# downcast to the smallest type that holds their values. The state is parsed
+# once per distinct county name (the categories) instead of once per row.
+# Besides "<County>, <ST>" names, every state has a "[<State>, county not
+# reported]" row (FIPS <state>999) whose state is spelled out in full.
+#
+# Run this in the Terminal to print the before/after memory footprint:
+#   python code/normalize.py
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Postal codes of the states (and DC), for the "[<State>, county not reported]" rows
+STATE_CODES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL",
+    "Indiana": "IN", "Iowa": "IA", "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA",
+    "Maine": "ME", "Maryland": "MD", "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN",
+    "Mississippi": "MS", "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
+    "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+    "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR",
+    "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD",
+    "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA",
+    "Washington": "WA", "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+}
+
+
+def state_of(county_name):
+    # "Travis County, TX" -> "TX"; "[Texas, county not reported]" -> "TX";
+    # None for a name without a known state
+    name = str(county_name).strip()
+    if name.startswith("[") and name.endswith("]"):
+        return STATE_CODES.get(name[1:-1].split(",")[0].strip())
+    state = name.rsplit(",", 1)[-1].strip().upper()
+    return state if "," in name and state in STATE_CODES.values() else None
+
+
+def parse_state(county):
+    # State of every county name (see state_of), as a categorical aligned
+    # with `county`
+    county = county.astype("category")
+    categories = pd.Index(county.cat.categories)
+
+    # Parse each distinct county name once, then map back through the codes
+    category_states = pd.Index([state_of(name) for name in categories], dtype=object)
+    state_codes, states = pd.factorize(category_states, sort=True)
+
+    codes = county.cat.codes.to_numpy()
+    row_codes = np.where(codes >= 0, state_codes[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(row_codes, categories=states), index=county.index)
+
+
+def downcast_numeric(df):
+    # Smallest integer/float type for every numeric column
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="unsigned" if df[col].min() >= 0 else "integer")
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="float")
+    return df
+
+
+def normalize_locations(df):
+    df['County Name'] = df['County Name'].astype("category")
+    df['State Name'] = parse_state(df['County Name'])
+    df['Avg. Posting Intensity (Jan 2023 - Dec 2023)'] = df['Avg. Posting Intensity (Jan 2023 - Dec 2023)'].astype("category")
+    return downcast_numeric(df)
+
+
+def memory_footprint(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def footprint_report():
+    # Compare the cleaned location frame as it used to be held (object
+    # strings, 64-bit numbers, per-row state parsing) with the normalized one
+    from ingest import clean_locations, read_source
+
+    raw = read_source("locations")
+
+    start = time.perf_counter()
+    before = clean_locations(raw.copy())
+    before['State Name'] = before['County Name'].map(state_of)
+    before_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = normalize_locations(clean_locations(raw.copy()))
+    after_time = time.perf_counter() - start
+
+    assert before['State Name'].fillna("").equals(after['State Name'].astype(object).fillna(""))
+
+    rows = []
+    for col in before.columns:
+        rows.append({
+            "Column": col,
+            "Before": f"{before[col].dtype}",
+            "After": f"{after[col].dtype}",
+            "Bytes before": int(before[col].memory_usage(index=False, deep=True)),
+            "Bytes after": int(after[col].memory_usage(index=False, deep=True)),
+        })
+    report = pd.DataFrame(rows)
+    totals = (memory_footprint(before), memory_footprint(after))
+    return report, totals, (before_time, after_time)
+
+
+if __name__ == "__main__":
+    report, (before, after), (before_time, after_time) = footprint_report()
+    print(report.to_string(index=False))
+    print(f"Total: {before:,} -> {after:,} bytes ({after / before:.0%})")
+    print(f"Cleaning time: {before_time * 1000:.1f} ms -> {after_time * 1000:.1f} ms")
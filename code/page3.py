@@ -1,221 +1,18 @@
+# --- Job Postings Timeseries ---
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from pathlib import Path
-
-# Load the data
-@st.cache_data
-def load_data():
-    file_path = Path("data/Job_Posting_Analytics_8_Occupations_in_3194_Counties_5318.xls")
-    df_jpt = pd.read_excel(file_path, sheet_name="Job Postings Timeseries", engine='xlrd', skiprows=2)
-    df_jpt = df_jpt.dropna(subset=["Month"])
-    df_jpt["Month"] = pd.to_datetime(df_jpt["Month"], format="%b %Y")
-    df_jpt["Unique Postings"] = pd.to_numeric(df_jpt["Unique Postings"], errors="coerce")
-    df_jpt = df_jpt.sort_values("Month").reset_index(drop=True)
-    return df_jpt
-
-df_jpt = load_data()
-
-# Professional Header using HTML and CSS
-st.markdown("""
-    <style>
-        /* General styles for the page */
-        body {
-            font-family: 'Arial', sans-serif;
-            color: #2c3e50;
-            background-color: #ecf0f1;
-        }
-        .header {
-            text-align: center;
-            padding: 40px;
-            background-color: #2c3e50;
-            color: white;
-            border-radius: 10px;
-            box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.1);
-            margin-bottom: 40px;
-        }
-        .header h1 {
-            font-size: 36px;  /* Smaller font size */
-            font-weight: 700;
-            letter-spacing: 3px;
-            text-shadow: 2px 2px 6px rgba(0, 0, 0, 0.2);
-        }
-        .header p {
-            font-size: 18px;
-            margin-top: 10px;
-            font-weight: 400;
-            color: #ecf0f1;
-        }
-
-        .section-header {
-            font-size: 24px;
-            font-weight: 600;
-            margin-top: 30px;
-            color: #34495e;
-        }
-
-        .description {
-            font-size: 16px;
-            color: #7f8c8d;
-            margin-bottom: 30px;
-        }
-
-        .stSlider {
-            margin-top: 20px;
-        }
-
-        .stSelectbox, .stDateInput, .stCheckbox {
-            margin-bottom: 20px;
-        }
-
-        .stMarkdown {
-            font-size: 16px;
-        }
-
-        .stButton {
-            margin-top: 20px;
-        }
-
-        /* Animation styles */
-        .fadeIn {
-            animation: fadeIn 1.5s ease-in-out;
-        }
-
-        @keyframes fadeIn {
-            0% { opacity: 0; }
-            100% { opacity: 1; }
-        }
-    </style>
-    <div class="header fadeIn">
-        <h1>Job Postings Time Series Analysis</h1>
-        <p>Explore and analyze trends in job postings over time with detailed visualizations and forecasts.</p>
-    </div>
-""", unsafe_allow_html=True)
-
-# Streamlit App Layout
-st.write("""
-    This tool allows you to explore job posting trends over time and forecast future postings using a SARIMA model.
-    You can filter the data by selecting a custom date range, fine-tune the model parameters, and view projected job posting trends.
-    The SARIMA model allows us to predict future data points based on past trends, considering both seasonality and trends in the data.
-""")
-
-# Date Range Picker
-st.write("### Filter the Data by Date Range")
-st.write("Select the start and end dates for the data you'd like to analyze.")
-min_date = df_jpt["Month"].min().date()
-max_date = df_jpt["Month"].max().date()
-
-start_date, end_date = st.date_input(
-    "Select the date range for your analysis:",
-    value=(min_date, max_date),
-    min_value=min_date,
-    max_value=max_date
-)
-
-# Convert selected dates to datetime64[ns]
-start_date = pd.to_datetime(start_date)
-end_date = pd.to_datetime(end_date)
-
-# Filter data based on selected date range
-filtered_df_jpt = df_jpt[(df_jpt["Month"] >= start_date) & (df_jpt["Month"] <= end_date)]
-
-# Display raw data option
-if st.checkbox("Show Raw Data (within selected date range)", help="Check this box to view the data table for the selected period."):
-    st.dataframe(filtered_df_jpt)
-
-# Plot the raw data
-st.subheader("Raw Time Series of Unique Job Postings")
-st.write("This plot shows the raw job postings trend over time, based on the selected date range.")
-fig = go.Figure()
-
-# Add trace for the actual job postings
-fig.add_trace(go.Scatter(
-    x=filtered_df_jpt['Month'],
-    y=filtered_df_jpt['Unique Postings'],
-    mode='lines+markers',
-    name='Actual Job Postings',
-    text=filtered_df_jpt['Unique Postings'],  # Tooltip with unique postings value
-    hovertemplate='<b>%{x}</b><br>Unique Postings: %{text}<extra></extra>',  # Hover info
-))
-
-fig.update_layout(
-    title="Unique Job Postings Over Time",
-    xaxis_title="Month",
-    yaxis_title="Unique Postings",
-    hovermode="closest",  # Show the hover details closest to the cursor
-    template="plotly_dark"
-)
-
-st.plotly_chart(fig)
-
-# Preprocessing: Take log of the data for stabilization
-filtered_df_jpt['log_postings'] = np.log(filtered_df_jpt['Unique Postings'])
-
-# Interactive SARIMA Parameters
-st.sidebar.subheader("SARIMA Model Parameters")
-st.sidebar.write("Use these sliders to adjust the SARIMA model parameters. Experiment with different values to observe the effect on the forecast.")
-
-p = st.sidebar.slider('AR (p)', 0, 5, 1, help="The AR parameter controls the autoregressive part of the model.")
-d = st.sidebar.slider('I (d)', 0, 2, 1, help="The I parameter controls the differencing of the data to make it stationary.")
-q = st.sidebar.slider('MA (q)', 0, 5, 1, help="The MA parameter controls the moving average part of the model.")
-
-# Seasonal components
-seasonal_p = st.sidebar.slider('Seasonal AR (P)', 0, 3, 1, help="The seasonal AR parameter controls the seasonal autoregressive part.")
-seasonal_d = st.sidebar.slider('Seasonal I (D)', 0, 1, 1, help="The seasonal I parameter controls seasonal differencing.")
-seasonal_q = st.sidebar.slider('Seasonal MA (Q)', 0, 3, 1, help="The seasonal MA parameter controls the seasonal moving average.")
-seasonal_periods = st.sidebar.slider('Seasonality Period (s)', 1, 12, 12, help="The period (months) for seasonality. Typically 12 for monthly data.")
-
-# Perform Grid Search over different SARIMA configurations
-best_aic = float('inf')
-best_order = None
-best_seasonal_order = None
-best_model = None
-
-# Try different combinations of AR, I, MA, and seasonal parameters
-for p in range(0, 3):  # Trying AR values from 0 to 2
-    for d in range(0, 2):  # Trying I values from 0 to 1
-        for q in range(0, 3):  # Trying MA values from 0 to 2
-            for seasonal_p in range(0, 2):  # Seasonal AR values
-                for seasonal_q in range(0, 2):  # Seasonal MA values
-                    try:
-                        sarima_model = SARIMAX(filtered_df_jpt['log_postings'], 
-                                               order=(p, d, q),  # AR, I, MA terms
-                                               seasonal_order=(seasonal_p, seasonal_d, seasonal_q, seasonal_periods),  # Seasonal components
-                                               enforce_stationarity=False, 
-                                               enforce_invertibility=False)
-
-                        results = sarima_model.fit(disp=False)
-                        if results.aic < best_aic:
-                            best_aic = results.aic
-                            best_order = (p, d, q)
-                            best_seasonal_order = (seasonal_p, seasonal_d, seasonal_q, seasonal_periods)
-                            best_model = results
-                    except:
-                        continue
-
-# Output the best SARIMA parameters
-st.write(f"### Best SARIMA Parameters Found:")
-st.write(f"- AR, I, MA = {best_order}")
-st.write(f"- Seasonal AR, I, MA = {best_seasonal_order}")
-st.write(f"- Best AIC: {best_aic}")
-
-# Forecasting period - Allow the user to select the number of months to forecast
-forecast_steps = st.slider('Forecast Steps (Months)', 1, 24, 12, help="Select how many months into the future you want the forecast.")
-
-# Forecast the next 'forecast_steps' months
-forecast = best_model.get_forecast(steps=forecast_steps)
-forecast_index = pd.date_range(start=filtered_df_jpt['Month'].iloc[-1], periods=forecast_steps+1, freq='M')[1:]
-
-# Convert forecasted values from log scale back to original scale
-forecast_values = np.exp(forecast.predicted_mean)
-
-# Plot the forecast alongside the historical data using Plotly
-st.subheader(f"SARIMA Forecast for Unique Job Postings (Next {forecast_steps} months)")
-show_forecast = st.checkbox("Show Forecast Plot", value=True, help="Toggle to display or hide the forecast plot.")
-
-if show_forecast:
+from backtest import DEFAULT_HORIZON, DEFAULT_INITIAL, MIN_INITIAL, ModelSpec, run_backtest
+from batch_forecast import get_batch_forecasts
+from datasets import get_dataset
+from forecast_jobs import get_job_manager
+from forecasters import DEFAULT_ENGINE, ENGINES, Sarima
+from sarima import make_model
+
+
+def forecast_figure(filtered_df_jpt, forecast_index, forecast_values, lower, upper, engine_name):
+    # Plot the forecast and its 95% interval after the actual postings
     fig = go.Figure()
 
     # Add trace for actual job postings
@@ -228,6 +25,17 @@ if show_forecast:
         hovertemplate='<b>%{x}</b><br>Unique Postings: %{text}<extra></extra>',
     ))
 
+    # Add the prediction interval as a shaded band
+    fig.add_trace(go.Scatter(
+        x=np.concatenate([forecast_index, forecast_index[::-1]]),
+        y=np.concatenate([upper, lower[::-1]]),
+        fill='toself',
+        fillcolor='rgba(255, 0, 0, 0.15)',
+        line=dict(width=0),
+        hoverinfo='skip',
+        name='95% Interval',
+    ))
+
     # Add trace for forecasted values
     fig.add_trace(go.Scatter(
         x=forecast_index,
@@ -240,60 +48,403 @@ if show_forecast:
     ))
 
     fig.update_layout(
-        title="Job Postings with SARIMA Forecast",
+        title=f"Job Postings with {engine_name} Forecast",
         xaxis_title="Month",
         yaxis_title="Unique Postings",
         hovermode="closest",
         template="plotly_dark"
     )
 
-    st.plotly_chart(fig)
-
-# Option to download the forecast data
-if st.button("Download Forecast Data as CSV"):
-    forecast_df_jpt = pd.DataFrame({
-        'Date': forecast_index,
-        'Forecasted Unique Postings': forecast_values
-    })
-    st.download_button(label="Download CSV", data=forecast_df_jpt.to_csv(index=False), file_name="forecasted_job_postings.csv", mime="text/csv")
-
-# **Add Expandable Description Section**
-with st.expander("Understanding the Results 📝"):
+    return fig
+
+
+def engine_forecast(filtered_df_jpt, engine, forecast_steps):
+    # Forecast the next 'forecast_steps' months with a fitted engine (see forecasters.py)
+    forecast_index = pd.date_range(start=filtered_df_jpt['Month'].iloc[-1], periods=forecast_steps+1, freq='ME')[1:]
+
+    # Convert forecasted values from log scale back to original scale
+    forecast_values = np.exp(engine.forecast(forecast_steps))
+    lower, upper = (np.exp(bound) for bound in engine.interval(forecast_steps))
+    return forecast_index, forecast_values, lower, upper
+
+
+def show_forecast(filtered_df_jpt, engine, engine_name):
+    # Forecasting period - Allow the user to select the number of months to forecast
+    forecast_steps = st.slider('Forecast Steps (Months)', 1, 24, 12, help="Select how many months into the future you want the forecast.")
+
+    forecast_index, forecast_values, lower, upper = engine_forecast(filtered_df_jpt, engine, forecast_steps)
+
+    # Plot the forecast alongside the historical data using Plotly
+    st.subheader(f"{engine_name} Forecast for Unique Job Postings (Next {forecast_steps} months)")
+    show_forecast_plot = st.checkbox("Show Forecast Plot", value=True, help="Toggle to display or hide the forecast plot.")
+
+    if show_forecast_plot:
+        st.plotly_chart(forecast_figure(filtered_df_jpt, forecast_index, forecast_values, lower, upper, engine_name))
+
+    # Option to download the forecast data
+    if st.button("Download Forecast Data as CSV"):
+        forecast_df_jpt = pd.DataFrame({
+            'Date': forecast_index,
+            'Forecasted Unique Postings': forecast_values,
+            'Lower 95%': lower,
+            'Upper 95%': upper,
+        })
+        st.download_button(label="Download CSV", data=forecast_df_jpt.to_csv(index=False), file_name="forecasted_job_postings.csv", mime="text/csv")
+
+
+def show_search_results(search, filtered_df_jpt, seasonal_periods):
+    best_order = search.best_order
+    best_seasonal_order = search.best_seasonal_order
+    best_aic = search.best_aic
+    best_model = search.best_model
+
+    # Output the best SARIMA parameters
+    st.write(f"### Best SARIMA Parameters Found:")
+    st.write(f"- AR, I, MA = {best_order}")
+    st.write(f"- Seasonal AR, I, MA = {best_seasonal_order}")
+    st.write(f"- Best AIC: {best_aic}")
+    st.write(f"- Models fitted: {search.n_fits}")
+    if search.appended:
+        st.write(f"- Updated with {search.appended} new month(s) since the search, without refitting "
+                 f"(forecast error drift {search.drift:.2f})")
+
+    if search.timed_out:
+        st.warning("The model search hit its time budget; this is the best model among the fits that finished.")
+
+    # AIC, optimizer iterations, time and status of every candidate fit
+    with st.expander("Fit diagnostics"):
+        fits_df = pd.DataFrame([vars(record) for record in search.fits])
+        fits_df = fits_df.rename(columns={
+            "order": "Order (p, d, q)", "seasonal_order": "Seasonal Order (P, D, Q, s)", "aic": "AIC",
+            "iterations": "Iterations", "seconds": "Seconds", "status": "Status", "warm_start": "Warm start"})
+        fits_df[["Order (p, d, q)", "Seasonal Order (P, D, Q, s)"]] = fits_df[["Order (p, d, q)", "Seasonal Order (P, D, Q, s)"]].astype(str)
+        st.write(f"{len(fits_df)} fits, {fits_df['Seconds'].sum():.2f} s in total "
+                 f"({(fits_df['Status'] == 'converged').sum()} converged)")
+        st.dataframe(fits_df.sort_values("AIC").reset_index(drop=True))
+
+    show_forecast(filtered_df_jpt, Sarima.from_results(best_model, seasonal_periods), "SARIMA")
+
+
+@st.fragment(run_every=1)
+def show_search_progress(job, filtered_df_jpt, seasonal_periods):
+    # Polls the background search; reruns the whole page once it has finished
+    if job.done:
+        st.rerun()
+    st.progress(job.progress(), text=f"Searching SARIMA models... {job.fits_done} fits done")
+
+    best = job.best_so_far()
+    if best is None:
+        return
+    record, params = best
+    st.write(f"### Best SARIMA Parameters So Far:")
+    st.write(f"- AR, I, MA = {record.order}")
+    st.write(f"- Seasonal AR, I, MA = {record.seasonal_order}")
+    st.write(f"- AIC: {record.aic}")
+
+    best_model = make_model(filtered_df_jpt['log_postings'], record.order, record.seasonal_order).filter(params)
+    engine = Sarima.from_results(best_model, seasonal_periods)
+    st.plotly_chart(forecast_figure(filtered_df_jpt, *engine_forecast(filtered_df_jpt, engine, 12), "SARIMA"))
+
+
+def render():
+    # Load the data (shared by all sessions, see datasets.py)
+    df_jpt = get_dataset("timeseries")
+
+    # Professional Header using HTML and CSS
+    st.markdown("""
+        <style>
+            /* General styles for the page */
+            body {
+                font-family: 'Arial', sans-serif;
+                color: #2c3e50;
+                background-color: #ecf0f1;
+            }
+            .header {
+                text-align: center;
+                padding: 40px;
+                background-color: #2c3e50;
+                color: white;
+                border-radius: 10px;
+                box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.1);
+                margin-bottom: 40px;
+            }
+            .header h1 {
+                font-size: 36px;  /* Smaller font size */
+                font-weight: 700;
+                letter-spacing: 3px;
+                text-shadow: 2px 2px 6px rgba(0, 0, 0, 0.2);
+            }
+            .header p {
+                font-size: 18px;
+                margin-top: 10px;
+                font-weight: 400;
+                color: #ecf0f1;
+            }
+
+            .section-header {
+                font-size: 24px;
+                font-weight: 600;
+                margin-top: 30px;
+                color: #34495e;
+            }
+
+            .description {
+                font-size: 16px;
+                color: #7f8c8d;
+                margin-bottom: 30px;
+            }
+
+            .stSlider {
+                margin-top: 20px;
+            }
+
+            .stSelectbox, .stDateInput, .stCheckbox {
+                margin-bottom: 20px;
+            }
+
+            .stMarkdown {
+                font-size: 16px;
+            }
+
+            .stButton {
+                margin-top: 20px;
+            }
+
+            /* Animation styles */
+            .fadeIn {
+                animation: fadeIn 1.5s ease-in-out;
+            }
+
+            @keyframes fadeIn {
+                0% { opacity: 0; }
+                100% { opacity: 1; }
+            }
+        </style>
+        <div class="header fadeIn">
+            <h1>Job Postings Time Series Analysis</h1>
+            <p>Explore and analyze trends in job postings over time with detailed visualizations and forecasts.</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Streamlit App Layout
     st.write("""
-    ### Job Postings Time Series:
-    - The primary graph above represents the **actual job postings** over time.
-    - The **X-axis** shows the **months**, while the **Y-axis** shows the **number of job postings**.
-    - The trend line helps visualize how the job postings have evolved over the period.
-
-    ### What is SARIMA?
-    - **SARIMA (Seasonal ARIMA)** is a time series forecasting model that captures the patterns of seasonality and trends in historical data.
-    - This model tries to predict future data points based on the observed patterns in the historical data.
-    - It uses three key parameters: **AR (AutoRegressive)**, **I (Integrated)**, and **MA (Moving Average)** for non-seasonal data, and similar seasonal components for modeling seasonality.
-
-    ### How to Interpret the Forecast Plot:
-    - **Actual Job Postings**: The plot represents the actual number of job postings over time.
-    - **Forecasted Job Postings**: The dashed red line shows the forecasted values for the next 12 months (or as per your selection).
-    - **Forecast Period**: This forecast predicts the future trend based on the historical data. The number of months you want to forecast can be adjusted using the "Forecast Steps" slider in the sidebar.
-
-    ### SARIMA Model Parameters:
-    - **AR (p)**: Controls the relationship between an observation and several lagged observations.
-    - **I (d)**: Defines the differencing method used to make the series stationary (eliminates trends).
-    - **MA (q)**: Models the relationship between an observation and a lagged forecast error.
-    - **Seasonal AR, I, MA (P, D, Q)**: These seasonal components are responsible for modeling periodic fluctuations over time (e.g., yearly cycles, monthly patterns).
-
-    ### How to Use the Model:
-    - You can use the sliders in the sidebar to experiment with different values for AR, I, MA, and the seasonal components.
-    - **Higher AR or MA values** might make the model more sensitive to trends, while **lower values** may generalize the forecast.
-    - By adjusting the seasonal periods, you can model different seasonal patterns, such as **yearly or monthly cycles**.
-
-    ### Download Forecast Data:
-    - You can download the forecasted data as a CSV file to further analyze or use in reports. Just click the "Download Forecast Data as CSV" button below the forecast plot.
-
-    ### Tips for Interpreting the Forecast:
-    - If your forecast looks very different from actual postings, you might need to adjust the model parameters.
-    - Look for any **seasonal trends**—for example, job postings might increase in certain months of the year, which the model should capture.
+        This tool allows you to explore job posting trends over time and forecast future postings using a SARIMA model or one of several lightweight forecasting engines.
+        You can filter the data by selecting a custom date range, fine-tune the model parameters, and view projected job posting trends.
+        The SARIMA model allows us to predict future data points based on past trends, considering both seasonality and trends in the data.
     """)
 
-# Optional: Posting Intensity table
-if st.checkbox("Show Posting Intensity Table"):
-    st.dataframe(filtered_df_jpt[["Month", "Posting Intensity"]].reset_index(drop=True))
+    # Date Range Picker
+    st.write("### Filter the Data by Date Range")
+    st.write("Select the start and end dates for the data you'd like to analyze.")
+    min_date = df_jpt["Month"].min().date()
+    max_date = df_jpt["Month"].max().date()
+
+    start_date, end_date = st.date_input(
+        "Select the date range for your analysis:",
+        value=(min_date, max_date),
+        min_value=min_date,
+        max_value=max_date
+    )
+
+    # Convert selected dates to datetime64[ns]
+    start_date = pd.to_datetime(start_date)
+    end_date = pd.to_datetime(end_date)
+
+    # Filter data based on selected date range
+    filtered_df_jpt = df_jpt[(df_jpt["Month"] >= start_date) & (df_jpt["Month"] <= end_date)]
+
+    # Display raw data option
+    if st.checkbox("Show Raw Data (within selected date range)", help="Check this box to view the data table for the selected period."):
+        st.dataframe(filtered_df_jpt)
+
+    # Plot the raw data
+    st.subheader("Raw Time Series of Unique Job Postings")
+    st.write("This plot shows the raw job postings trend over time, based on the selected date range.")
+    fig = go.Figure()
+
+    # Add trace for the actual job postings
+    fig.add_trace(go.Scatter(
+        x=filtered_df_jpt['Month'],
+        y=filtered_df_jpt['Unique Postings'],
+        mode='lines+markers',
+        name='Actual Job Postings',
+        text=filtered_df_jpt['Unique Postings'],  # Tooltip with unique postings value
+        hovertemplate='<b>%{x}</b><br>Unique Postings: %{text}<extra></extra>',  # Hover info
+    ))
+
+    fig.update_layout(
+        title="Unique Job Postings Over Time",
+        xaxis_title="Month",
+        yaxis_title="Unique Postings",
+        hovermode="closest",  # Show the hover details closest to the cursor
+        template="plotly_dark"
+    )
+
+    st.plotly_chart(fig)
+
+    # Preprocessing: Take log of the data for stabilization
+    filtered_df_jpt['log_postings'] = np.log(filtered_df_jpt['Unique Postings'])
+
+    # Forecasting engine (see forecasters.py); SARIMA is the expensive one
+    engine_name = st.sidebar.selectbox(
+        "Forecasting Engine", list(ENGINES), index=list(ENGINES).index(DEFAULT_ENGINE),
+        help="Holt-Winters, Theta, seasonal naive and drift fit in milliseconds. "
+             "SARIMA searches many models and can take several seconds.")
+
+    if engine_name != "SARIMA":
+        seasonal_periods = st.sidebar.slider('Seasonality Period (s)', 1, 12, 12, help="The period (months) for seasonality. Typically 12 for monthly data.")
+        engine = ENGINES[engine_name](seasonal_periods).fit(filtered_df_jpt['log_postings'])
+        show_forecast(filtered_df_jpt, engine, engine_name)
+    else:
+        # Interactive SARIMA Parameters
+        st.sidebar.subheader("SARIMA Model Parameters")
+        st.sidebar.write("Use these sliders to adjust the SARIMA model parameters. Experiment with different values to observe the effect on the forecast.")
+
+        p = st.sidebar.slider('AR (p)', 0, 5, 1, help="The AR parameter controls the autoregressive part of the model.")
+        d = st.sidebar.slider('I (d)', 0, 2, 1, help="The I parameter controls the differencing of the data to make it stationary.")
+        q = st.sidebar.slider('MA (q)', 0, 5, 1, help="The MA parameter controls the moving average part of the model.")
+
+        # Seasonal components
+        seasonal_p = st.sidebar.slider('Seasonal AR (P)', 0, 3, 1, help="The seasonal AR parameter controls the seasonal autoregressive part.")
+        seasonal_d = st.sidebar.slider('Seasonal I (D)', 0, 1, 1, help="The seasonal I parameter controls seasonal differencing.")
+        seasonal_q = st.sidebar.slider('Seasonal MA (Q)', 0, 3, 1, help="The seasonal MA parameter controls the seasonal moving average.")
+        seasonal_periods = st.sidebar.slider('Seasonality Period (s)', 1, 12, 12, help="The period (months) for seasonality. Typically 12 for monthly data.")
+        search_method = st.sidebar.radio(
+            "Model search", ["stepwise", "grid"],
+            format_func={"stepwise": "Stepwise (auto d, D)", "grid": "Full grid"}.get,
+            help="Stepwise picks d and D with unit-root tests and only fits neighbours of the best model so far. "
+                 "Full grid fits every order up to 2 with the Seasonal I (D) above.")
+
+        # Search SARIMA configurations for the lowest AIC in a background job
+        # shared by all sessions (see forecast_jobs.py). A result saved by
+        # prewarm.py for the same data and settings is reused.
+        job = get_job_manager().submit(filtered_df_jpt['log_postings'], seasonal_d, seasonal_periods, search_method)
+        if not job.done:
+            show_search_progress(job, filtered_df_jpt, seasonal_periods)
+        elif job.error is not None:
+            st.error(f"The model search failed: {job.error}")
+        else:
+            show_search_results(job.result, filtered_df_jpt, seasonal_periods)
+
+    # Forecast accuracy of the engines on past data (see backtest.py)
+    with st.expander("Backtest Forecast Accuracy"):
+        st.write("Each engine is trained on the months before a forecast origin and scored on the months after it, "
+                 "for every origin in the selected range. Lower MAPE, sMAPE and MASE are better; "
+                 "a MASE below 1 beats the seasonal naive forecast.")
+        backtest_models = st.multiselect("Models", list(ENGINES), default=[name for name in ENGINES if name != "SARIMA"],
+                                         help="SARIMA runs its model search in every fold and takes much longer.")
+        backtest_window = st.radio("Training window", ["expanding", "sliding"], horizontal=True)
+        backtest_horizon = st.slider("Backtest horizon (months)", 1, 12, DEFAULT_HORIZON)
+        # Train on up to DEFAULT_INITIAL months, fewer in a short range so there
+        # are at least two folds, but never fewer than the engines need
+        backtest_initial = max(MIN_INITIAL, min(DEFAULT_INITIAL, len(filtered_df_jpt) - backtest_horizon - 1))
+        has_folds = len(filtered_df_jpt) - backtest_horizon >= backtest_initial
+        if not has_folds:
+            st.info(f"The selected range is too short to backtest a {backtest_horizon}-month horizon: it needs at "
+                    f"least {MIN_INITIAL + backtest_horizon} months. Widen the date range or shorten the horizon.")
+        if st.button("Run backtest", disabled=not has_folds) and backtest_models:
+            with st.spinner("Backtesting..."):
+                try:
+                    st.session_state["backtest"], _ = run_backtest(
+                        filtered_df_jpt["Unique Postings"], [ModelSpec(name) for name in backtest_models],
+                        horizon=backtest_horizon, initial=backtest_initial,
+                        window=backtest_window, seasonal_periods=seasonal_periods)
+                except ValueError as error:
+                    st.error(str(error))
+        if "backtest" in st.session_state:
+            st.dataframe(st.session_state["backtest"])
+
+    # Forecasts of every state and county, built by batch_forecast.py
+    # These are illustrative: the workbook has no monthly history per state or
+    # county, so every regional series is the national one scaled by a fixed
+    # share. Their forecasts are the national forecast scaled the same way and
+    # already add up, so no reconciliation choice is offered (see batch_forecast.py)
+    with st.expander("Illustrative State and County Forecasts"):
+        forecasts = get_batch_forecasts()
+        if forecasts is None:
+            st.info("No state and county forecasts yet. Build them in the Terminal: python code/batch_forecast.py")
+        else:
+            st.warning("Illustrative only: the workbook has no monthly data per state or county. Each series "
+                       "below is the national series split by the county's share of the 2023 unique postings, "
+                       "so its forecast is the national forecast times that share, not a forecast of the "
+                       "county's own history.")
+            regional_engine = st.selectbox("Engine", sorted(forecasts["Engine"].unique()), key="regional_engine")
+            level = st.radio("Level", ["State", "County"], horizontal=True)
+            regional = forecasts[(forecasts["Engine"] == regional_engine) & (forecasts["Level"] == level)]
+            if level == "County":
+                state = st.selectbox("State", sorted(regional["State"].unique()), key="regional_state")
+                regional = regional[regional["State"] == state]
+            columns = ["Forecast", "Lower", "Upper"]
+
+            months = regional["Month"].nunique()
+            totals = (regional.groupby("Series", observed=True)[columns].sum()
+                      .sort_values(columns[-1], ascending=False))
+            st.write(f"Forecasted unique postings over the next {months} months:")
+            st.dataframe(totals.round(0))
+
+            series_name = st.selectbox("Series", list(totals.index), key="regional_series")
+            series = regional[regional["Series"] == series_name]
+            fig = go.Figure([
+                go.Scatter(x=series["Month"], y=series["Upper"], line=dict(width=0), showlegend=False, hoverinfo='skip'),
+                go.Scatter(x=series["Month"], y=series["Lower"], fill='tonexty', fillcolor='rgba(255, 0, 0, 0.15)',
+                           line=dict(width=0), name='95% Interval', hoverinfo='skip'),
+                go.Scatter(x=series["Month"], y=series["Forecast"], mode='lines+markers', name='Forecast',
+                           line=dict(dash='dash', color='red')),
+            ])
+            fig.update_layout(title=f"{series_name}: {regional_engine} Forecast", xaxis_title="Month",
+                              yaxis_title="Unique Postings", template="plotly_dark")
+            st.plotly_chart(fig)
+
+    # **Add Expandable Description Section**
+    with st.expander("Understanding the Results 📝"):
+        st.write("""
+        ### Job Postings Time Series:
+        - The primary graph above represents the **actual job postings** over time.
+        - The **X-axis** shows the **months**, while the **Y-axis** shows the **number of job postings**.
+        - The trend line helps visualize how the job postings have evolved over the period.
+
+        ### What is SARIMA?
+        - **SARIMA (Seasonal ARIMA)** is a time series forecasting model that captures the patterns of seasonality and trends in historical data.
+        - This model tries to predict future data points based on the observed patterns in the historical data.
+        - It uses three key parameters: **AR (AutoRegressive)**, **I (Integrated)**, and **MA (Moving Average)** for non-seasonal data, and similar seasonal components for modeling seasonality.
+
+        ### How to Interpret the Forecast Plot:
+        - **Actual Job Postings**: The plot represents the actual number of job postings over time.
+        - **Forecasted Job Postings**: The dashed red line shows the forecasted values for the next 12 months (or as per your selection).
+        - **95% Interval**: The shaded band is the range the forecasting engine expects the postings to fall in 95% of the time.
+        - **Forecast Period**: This forecast predicts the future trend based on the historical data. The number of months you want to forecast can be adjusted using the "Forecast Steps" slider in the sidebar.
+
+        ### Forecasting Engines:
+        - **Holt-Winters (ETS)**: Exponential smoothing of the level, trend and seasonal pattern (the default).
+        - **Theta**: Exponential smoothing plus half the long-run linear trend, on the seasonally adjusted series.
+        - **Seasonal naive**: Each month repeats the same month of the last year.
+        - **Drift**: Extends the straight line through the first and last observations.
+        - **SARIMA**: Searches many seasonal ARIMA models for the lowest AIC; the most flexible and by far the slowest.
+
+        ### SARIMA Model Parameters:
+        - **AR (p)**: Controls the relationship between an observation and several lagged observations.
+        - **I (d)**: Defines the differencing method used to make the series stationary (eliminates trends).
+        - **MA (q)**: Models the relationship between an observation and a lagged forecast error.
+        - **Seasonal AR, I, MA (P, D, Q)**: These seasonal components are responsible for modeling periodic fluctuations over time (e.g., yearly cycles, monthly patterns).
+
+        ### How to Use the Model:
+        - You can use the sliders in the sidebar to experiment with different values for AR, I, MA, and the seasonal components.
+        - **Higher AR or MA values** might make the model more sensitive to trends, while **lower values** may generalize the forecast.
+        - By adjusting the seasonal periods, you can model different seasonal patterns, such as **yearly or monthly cycles**.
+
+        ### Download Forecast Data:
+        - You can download the forecasted data as a CSV file to further analyze or use in reports. Just click the "Download Forecast Data as CSV" button below the forecast plot.
+
+        ### Tips for Interpreting the Forecast:
+        - If your forecast looks very different from actual postings, you might need to adjust the model parameters.
+        - Look for any **seasonal trends**—for example, job postings might increase in certain months of the year, which the model should capture.
+        """)
+
+    # Optional: Posting Intensity table
+    if st.checkbox("Show Posting Intensity Table"):
+        st.dataframe(filtered_df_jpt[["Month", "Posting Intensity"]].reset_index(drop=True))
+
+if __name__ == "__main__":
+    # Run this page on its own: streamlit run code/page3.py
+    st.set_page_config(layout="wide")
+    render()
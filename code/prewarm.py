@@ -0,0 +1,159 @@
+# Warm-up of data caches, indexes, maps and the default forecast.
+#
+# The first visitor after a deploy or restart would otherwise pay for Excel
+# parsing, cleaning, geocoding and the SARIMA order search. Each artifact below
+# is built only if it is missing or out of date, and the time it took is
+# reported. With --force every artifact is rebuilt. The in-memory ones (shared
+# datasets, state and county indexes) live in the process, so they are loaded
+# on every run and reported as "in-process".
+#
+# Run this in the Terminal to build the on-disk artifacts:
+#   python code/prewarm.py [--force]
+# or warm up and then start the server in the same process, so the in-memory
+# caches (shared datasets, state index) are ready before traffic arrives:
+#   python code/prewarm.py serve code/data_to_web.py [streamlit options]
+import sys
+import time
+
+import batch_forecast
+import datasets
+import ingest
+import map_cache
+import sarima
+from datasets import _loaded, get_dataset
+from gazetteer import attach_centroids, unplaced_counties
+from geocache import GeocodeCache
+
+
+# --- Artifacts: (name, is_fresh, build) ---
+# build(force) returns whether it did any work; with force it rebuilds even
+# what is already there. is_fresh is None for in-memory artifacts, which are
+# built in every process.
+def _parquet_artifact(name):
+    return (f"parquet: {name}", lambda: ingest.is_fresh(name), lambda force: _build_parquet(name, force))
+
+
+def _build_parquet(name, force):
+    if ingest.is_fresh(name) and not force:
+        return False
+    ingest.ingest(name, force=force)
+    return True
+
+
+def _build_datasets(force):
+    if force:
+        datasets._load_shared.clear()
+        _loaded.clear()
+    for name in ingest.SOURCES:
+        get_dataset(name)
+
+
+def _build_state_index(force):
+    from state_index import _shared_state_index, get_state_index
+
+    if force:
+        _shared_state_index.clear()
+    get_state_index()
+
+
+def _build_county_index(force):
+    from spatial_index import _shared_county_index, get_county_index
+
+    if force:
+        _shared_county_index.clear()
+    get_county_index()
+
+
+def _locations_fresh():
+    # Every county the gazetteer can't place has a (cached) geocoder answer
+    missing = set(unplaced_counties(get_dataset("locations")))
+    return len(GeocodeCache().get_many(missing)) == len(missing)
+
+
+def _build_locations(force):
+    # Geocodes the counties without a cached answer. Cached answers are kept
+    # even with force: they come from a rate-limited external service
+    if _locations_fresh():
+        return False
+    attach_centroids(get_dataset("locations"), geocode_missing=True)
+    return True
+
+
+def _build_maps(force):
+    return map_cache.build_all(force=force) > 0
+
+
+def _default_forecast_key():
+    y = sarima.default_series(get_dataset("timeseries"))
+    return y, sarima.search_key(y, sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS, sarima.DEFAULT_METHOD)
+
+
+def _forecast_fresh():
+    _, key = _default_forecast_key()
+    return sarima.has_saved_search(key)
+
+
+def _build_forecast(force):
+    y, key = _default_forecast_key()
+    # When the sheet gained months, extend the last search instead of redoing
+    # it (unless forced)
+    result = None
+    if not force:
+        result = sarima.update_search(y, sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS,
+                                      sarima.DEFAULT_METHOD)
+    if result is None:
+        result = sarima.search(y, sarima.DEFAULT_SEASONAL_D, sarima.DEFAULT_SEASONAL_PERIODS, sarima.DEFAULT_METHOD)
+    sarima.save_search(key, result)
+    return True
+
+
+def _build_batch(force):
+    batch_forecast.run_batch()
+    return True
+
+
+ARTIFACTS = [_parquet_artifact(name) for name in ingest.SOURCES] + [
+    ("shared datasets", None, _build_datasets),
+    ("state index", None, _build_state_index),
+    ("county locations", _locations_fresh, _build_locations),
+    ("state maps", map_cache.is_fresh, _build_maps),
+    ("county index", None, _build_county_index),
+    ("default forecast", _forecast_fresh, _build_forecast),
+    ("batch forecasts", batch_forecast.is_fresh, _build_batch),
+]
+
+
+def prewarm(force=False, log=print):
+    # Build every stale artifact; returns [(name, status, seconds)]
+    report = []
+    for name, is_fresh, build in ARTIFACTS:
+        start = time.perf_counter()
+        if is_fresh is None:
+            build(force)
+            status = "in-process"
+        elif not force and is_fresh():
+            status = "up to date"
+        else:
+            status = "built" if build(force) else "up to date"
+        seconds = time.perf_counter() - start
+        report.append((name, status, seconds))
+        if log:
+            log(f"{name:<24} {status:<11} {seconds:8.2f} s")
+    return report
+
+
+def serve(streamlit_args):
+    # Warm up in this process, then hand over to the Streamlit server
+    from streamlit.web import cli as stcli
+
+    prewarm()
+    sys.argv = ["streamlit", "run", *streamlit_args]
+    sys.exit(stcli.main())
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "serve":
+        serve(args[1:])
+    else:
+        prewarm(force="--force" in args)
@@ -0,0 +1,135 @@
+# Hierarchical reconciliation of the batch forecasts.
+#
+# Forecasts made separately for the nation, the states and the counties don't
+# add up: the states' forecasts don't sum to the national one, nor a state's
+# counties to the state. Reconciliation turns the base forecasts y_hat
+# (series x steps) into coherent ones, y_tilde = S G y_hat, where S is the
+# summing matrix (series x counties) that adds the county series up into every
+# series of the hierarchy and G maps base forecasts to county forecasts:
+#   Bottom-up    counties' own forecasts, summed up
+#   Top-down     the national forecast, split by the counties' average
+#                historical shares of the national series
+#   MinT-shrink  minimum trace (Wickramasuriya, Athanasopoulos & Hyndman),
+#                weighted by the covariance W of the in-sample one-step errors,
+#                shrunk towards its diagonal (Schafer & Strimmer)
+#
+# S has one nonzero per county in each level (3 per column), so it is kept as
+# a scipy.sparse matrix instead of a dense (series x counties) one. MinT is
+# computed in its projection form
+#   y_tilde = y_hat - W C' (C W C')^-1 C y_hat
+# where C = [I, -S_agg] is the (aggregates x series) constraint matrix, also
+# sparse. With the residuals E (months x series), W = lambda D + (1 - lambda)
+# E'E / T is a diagonal plus a low rank term, so W C' is built from sparse and
+# (series x months) products and the only system solved is aggregates x
+# aggregates (52 x 52 here), never series x series.
+#
+# See benchmarks/bench_reconcile.py for the sparse vs dense comparison.
+import numpy as np
+import scipy.sparse as sp
+
+METHODS = ("Bottom-up", "Top-down", "MinT-shrink")
+
+
+def summing_matrix(ids):
+    # (S, bottom): S as a CSR matrix (series x bottom series) and the boolean
+    # mask of the bottom series, from the Level and State columns of
+    # batch_forecast.series_panel()'s ids. The national row sums every county,
+    # a state row its counties and a county row itself.
+    levels = ids["Level"].to_numpy()
+    states = ids["State"].to_numpy()
+    bottom = levels == "County"
+    bottom_rows = np.flatnonzero(bottom)
+    columns = np.arange(len(bottom_rows))
+
+    rows, cols = [bottom_rows], [columns]
+    for row in np.flatnonzero(~bottom):
+        if levels[row] == "National":
+            covered = columns
+        else:
+            covered = columns[states[bottom_rows] == states[row]]
+        rows.append(np.full(len(covered), row))
+        cols.append(covered)
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    S = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(ids), len(bottom_rows)))
+    return S, bottom
+
+
+def constraint_matrix(S, bottom):
+    # C (aggregates x series): C y = 0 exactly when y is coherent
+    aggregates = np.flatnonzero(~bottom)
+    n_series = S.shape[0]
+    pick_aggregates = sp.csr_matrix((np.ones(len(aggregates)), (np.arange(len(aggregates)), aggregates)),
+                                    shape=(len(aggregates), n_series))
+    bottom_rows = np.flatnonzero(bottom)
+    pick_bottom = sp.csr_matrix((np.ones(len(bottom_rows)), (np.arange(len(bottom_rows)), bottom_rows)),
+                                shape=(len(bottom_rows), n_series))
+    return (pick_aggregates - S[aggregates] @ pick_bottom).tocsr()
+
+
+def incoherence(S, bottom, forecasts):
+    # Largest absolute gap between an aggregate's forecast and the sum of its counties'
+    return float(np.nanmax(np.abs(constraint_matrix(S, bottom) @ forecasts)))
+
+
+def bottom_up(S, bottom, base):
+    return S @ base[bottom]
+
+
+def top_down(S, bottom, base, history):
+    # Split the national (first row) forecast by the counties' average shares
+    # of the national series over the history (series x months)
+    shares = np.mean(history[bottom] / history[0], axis=1)
+    return S @ (shares[:, None] * base[0])
+
+
+def shrinkage_intensity(residuals):
+    # Schafer & Strimmer's optimal shrinkage of the correlations of the
+    # (months x series) residuals towards zero. The sums over all series pairs
+    # are rewritten in terms of (months x months) products, so the series x
+    # series correlation matrix is never formed.
+    n_obs = len(residuals)
+    sd = residuals.std(axis=0, ddof=1)
+    x = (residuals - residuals.mean(axis=0)) / np.where(sd > 0, sd, 1)
+    squares = x ** 2
+    gram = x @ x.T  # (months x months); ||X'X||_F = ||X X'||_F
+    cross_sq = np.sum(gram ** 2)  # sum over pairs of (sum_t x_ti x_tj)^2
+    # Estimated variances of the correlations, summed over pairs i != j
+    sum_w2 = np.sum(squares.sum(axis=1) ** 2) - np.sum(squares ** 2)
+    sum_wbar2 = cross_sq - np.sum(squares.sum(axis=0) ** 2)
+    variances = (sum_w2 - sum_wbar2 / n_obs) / (n_obs * (n_obs - 1))
+    # Squared correlations, summed over pairs i != j
+    correlations = cross_sq / (n_obs - 1) ** 2 - np.sum((squares.sum(axis=0) / (n_obs - 1)) ** 2)
+    if correlations <= 0:
+        return 1.0
+    return float(np.clip(variances / correlations, 0, 1))
+
+
+def mint_shrink(S, bottom, base, residuals):
+    # MinT with the shrunk covariance of the (months x series) in-sample
+    # one-step residuals; months where a series has no residual are dropped
+    residuals = residuals[np.all(np.isfinite(residuals), axis=1)]
+    n_obs = len(residuals)
+    lam = shrinkage_intensity(residuals)
+    # W = diag(lam * variances) + U U'
+    variances = np.sum(residuals ** 2, axis=0) / n_obs
+    U = residuals.T * np.sqrt((1 - lam) / n_obs)
+
+    C = constraint_matrix(S, bottom)
+    CT = C.T.tocsr()
+    WCT = CT.multiply(lam * variances[:, None]).toarray() + U @ (C @ U).T
+    CWCT = C @ WCT
+    # Least squares: C W C' is singular when the residuals are coherent
+    # themselves, and then there is nothing to correct in that direction
+    adjustment = np.linalg.lstsq(CWCT, C @ base, rcond=None)[0]
+    return base - WCT @ adjustment
+
+
+def reconcile(S, bottom, base, history, residuals, method):
+    # Coherent forecasts (series x steps) by one of METHODS
+    if method == "Bottom-up":
+        return bottom_up(S, bottom, base)
+    if method == "Top-down":
+        return top_down(S, bottom, base, history)
+    if method == "MinT-shrink":
+        return mint_shrink(S, bottom, base, residuals)
+    raise ValueError(f"Unknown reconciliation method {method!r}; expected one of {', '.join(METHODS)}")
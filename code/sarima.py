@@ -0,0 +1,425 @@
+# SARIMA order search for the timeseries page.
+#
+# Two search methods are available on the log of Unique Postings:
+#   - "stepwise": auto-ARIMA style neighbour search with d and D picked by
+#     unit-root tests (see stepwise.py); the default
+#   - "grid": fits every (p, d, q)(P, seasonal_d, Q, s) candidate in the ranges
+#     below
+# Both keep the lowest AIC. A search is identified by search_key(), a hash of
+# the series plus the search settings; the page runs searches as background
+# jobs keyed by it (see forecast_jobs.py). A search result can also be saved
+# to the model store (model_store.py; prewarm.py does this for the page's
+# default settings) and is reused across restarts.
+#
+# Candidate fits run on a process pool (SARIMA_WORKERS processes), so the
+# search doesn't hold the GIL of the Streamlit server while other sessions
+# are being served. Each fit is capped in optimizer iterations and wall time,
+# and the whole search in wall time; a FitRecord of every fit is kept for the
+# page's diagnostics table.
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from model_store import ModelStore
+
+# Candidate ranges of the grid search
+P_RANGE = range(0, 3)  # Trying AR values from 0 to 2
+D_RANGE = range(0, 2)  # Trying I values from 0 to 1
+Q_RANGE = range(0, 3)  # Trying MA values from 0 to 2
+SEASONAL_P_RANGE = range(0, 2)  # Seasonal AR values
+SEASONAL_Q_RANGE = range(0, 2)  # Seasonal MA values
+
+# Bump this whenever SearchResult or the search itself changes, so results
+# saved by older code are not reused.
+SEARCH_VERSION = 2
+
+# Optimizer budgets: iterations and seconds per fit, seconds per search.
+# SARIMA_MAXITER, SARIMA_FIT_SECONDS and SARIMA_SEARCH_SECONDS override.
+MAX_ITER = int(os.environ.get("SARIMA_MAXITER", 50))
+FIT_TIME_BUDGET = float(os.environ.get("SARIMA_FIT_SECONDS", 5))
+SEARCH_TIME_BUDGET = float(os.environ.get("SARIMA_SEARCH_SECONDS", 120))
+
+# Incremental updates: a stored search on the series minus its last (up to)
+# MAX_NEW_MONTHS months is extended with the new months instead of searching
+# again, unless the new one-step-ahead forecast errors drift (RMS of the
+# standardized errors above SARIMA_DRIFT_THRESHOLD).
+MAX_NEW_MONTHS = 12
+DRIFT_THRESHOLD = float(os.environ.get("SARIMA_DRIFT_THRESHOLD", 2.0))
+
+# Sidebar defaults of the timeseries page
+DEFAULT_METHOD = "stepwise"
+DEFAULT_SEASONAL_D = 1
+DEFAULT_SEASONAL_PERIODS = 12
+
+SEARCH_METHODS = ("stepwise", "grid")
+
+
+@dataclass
+class SearchResult:
+    best_order: tuple = None
+    best_seasonal_order: tuple = None
+    best_aic: float = float('inf')
+    best_model: object = None  # fitted SARIMAXResults
+    aic_table: list = field(default_factory=list)  # (order, seasonal_order, aic) per fitted candidate
+    n_fits: int = 0  # models fitted by the search, including failed fits
+    fits: list = field(default_factory=list)  # FitRecord per candidate, in search order
+    timed_out: bool = False  # stopped by the search time budget
+    appended: int = 0  # observations added by incremental updates since the search ran
+    drift: float = None  # forecast error drift of the last incremental update
+
+
+@dataclass
+class FitRecord:
+    # Telemetry of one candidate fit
+    order: tuple
+    seasonal_order: tuple
+    aic: float = None
+    iterations: int = 0
+    seconds: float = 0.0
+    status: str = "failed"  # converged, max iterations, not converged, time budget, failed or skipped
+    warm_start: bool = False
+
+
+class _FitTimeBudgetExceeded(Exception):
+    pass
+
+
+def candidate_orders(seasonal_d, seasonal_periods):
+    # Every (order, seasonal_order) pair of the grid, in search order
+    for p in P_RANGE:
+        for d in D_RANGE:
+            for q in Q_RANGE:
+                for seasonal_p in SEASONAL_P_RANGE:
+                    for seasonal_q in SEASONAL_Q_RANGE:
+                        yield (p, d, q), (seasonal_p, seasonal_d, seasonal_q, seasonal_periods)
+
+
+def make_model(y, order, seasonal_order):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    return SARIMAX(y,
+                   order=order,  # AR, I, MA terms
+                   seasonal_order=seasonal_order,  # Seasonal components
+                   enforce_stationarity=False,
+                   enforce_invertibility=False)
+
+
+def param_names(order, seasonal_order):
+    # SARIMAX parameter names (no trend, no exog), in parameter vector order
+    p, _, q = order
+    P, _, Q, s = seasonal_order
+    return ([f"ar.L{i}" for i in range(1, p + 1)] + [f"ma.L{i}" for i in range(1, q + 1)]
+            + [f"ar.S.L{s * i}" for i in range(1, P + 1)] + [f"ma.S.L{s * i}" for i in range(1, Q + 1)]
+            + ["sigma2"])
+
+
+def warm_start_params(donor_order, donor_seasonal_order, donor_params, order, seasonal_order):
+    # Start values for a nearby order: the donor's coefficients where the
+    # terms match, zero for new terms. A model that only adds terms starts at
+    # the donor's optimum.
+    donor = dict(zip(param_names(donor_order, donor_seasonal_order), donor_params))
+    return np.array([donor.get(name, 0.0) for name in param_names(order, seasonal_order)])
+
+
+def fit_candidate(y, order, seasonal_order, start_params=None, maxiter=MAX_ITER, time_budget=FIT_TIME_BUDGET):
+    # (results, FitRecord); results is None if the fit failed. A fit that runs
+    # out of time is stopped and evaluated at the optimizer's last iterate.
+    record = FitRecord(order, seasonal_order, warm_start=start_params is not None)
+    model = make_model(y, order, seasonal_order)
+    start = time.perf_counter()
+    last = None
+
+    def callback(xk):
+        nonlocal last
+        record.iterations += 1
+        last = xk
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            raise _FitTimeBudgetExceeded
+
+    results = None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            results = model.fit(start_params=start_params, maxiter=maxiter, disp=False, callback=callback)
+            if results.mle_retvals.get("converged"):
+                record.status = "converged"
+            else:
+                record.status = "max iterations" if record.iterations >= maxiter else "not converged"
+        except _FitTimeBudgetExceeded:
+            # The optimizer works on untransformed parameters
+            results = model.filter(model.transform_params(last))
+            record.status = "time budget"
+        except Exception:
+            pass
+    record.seconds = time.perf_counter() - start
+    if results is not None:
+        record.aic = results.aic
+    return results, record
+
+
+def _fit_summary(index, y, order, seasonal_order, start_params=None, time_budget=FIT_TIME_BUDGET):
+    # Runs in a pool worker: only the AIC, the parameter vector and the fit
+    # record are sent back, the best model is rebuilt from its parameters
+    results, record = fit_candidate(y, order, seasonal_order, start_params, time_budget=time_budget)
+    if results is None:
+        return index, None, None, record
+    return index, results.aic, np.asarray(results.params), record
+
+
+# --- Process pool shared by every search in this server process ---
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def default_workers():
+    # SARIMA_WORKERS overrides; by default up to 4 cores are used
+    return int(os.environ.get("SARIMA_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+def get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn: forking a multi-threaded Streamlit server is not safe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _summaries(y, candidates, workers, start_params=None, deadline=None):
+    # (index, aic, params, record) of every candidate, in completion order.
+    # Candidates not started by `deadline` (a time.monotonic() value) are
+    # reported as skipped.
+    if start_params is None:
+        start_params = [None] * len(candidates)
+    done = set()
+
+    def skipped():
+        for index, (order, seasonal_order) in enumerate(candidates):
+            if index not in done:
+                yield index, None, None, FitRecord(order, seasonal_order, status="skipped")
+
+    if workers <= 1:
+        for index, (order, seasonal_order) in enumerate(candidates):
+            if deadline is not None and time.monotonic() > deadline:
+                yield from skipped()
+                return
+            done.add(index)
+            yield _fit_summary(index, y, order, seasonal_order, start_params[index])
+        return
+
+    pool = get_pool(workers)
+    futures = [pool.submit(_fit_summary, index, y, order, seasonal_order, start_params[index])
+               for index, (order, seasonal_order) in enumerate(candidates)]
+    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            summary = future.result()
+            done.add(summary[0])
+            yield summary
+    except FuturesTimeoutError:
+        # Out of time; running fits finish within their own budget
+        for future in futures:
+            future.cancel()
+        yield from skipped()
+    except BrokenProcessPool:
+        # A worker died; drop the pool and fit what's left in this process
+        _reset_pool(pool)
+        for index, (order, seasonal_order) in enumerate(candidates):
+            if index not in done:
+                done.add(index)
+                yield _fit_summary(index, y, order, seasonal_order, start_params[index])
+
+
+def grid_search(y, seasonal_d, seasonal_periods, workers=None, time_budget=SEARCH_TIME_BUDGET, on_fit=None):
+    # Fit every candidate (on a process pool if workers > 1) and keep the one
+    # with the lowest AIC. Ties go to the earlier candidate in search order,
+    # so the result doesn't depend on the order in which fits finish.
+    # on_fit(record, params) is called as each fit finishes.
+    if workers is None:
+        workers = default_workers()
+    candidates = list(candidate_orders(seasonal_d, seasonal_periods))
+    deadline = time.monotonic() + time_budget
+
+    fitted = {}
+    records = {}
+    for index, aic, params, record in _summaries(y, candidates, workers, deadline=deadline):
+        records[index] = record
+        if on_fit is not None:
+            on_fit(record, params)
+        if aic is not None and np.isfinite(aic):
+            fitted[index] = (aic, params)
+
+    result = SearchResult()
+    result.fits = [records[index] for index in sorted(records)]
+    result.n_fits = sum(record.status != "skipped" for record in result.fits)
+    result.timed_out = result.n_fits < len(candidates)
+    result.aic_table = [(*candidates[index], fitted[index][0]) for index in sorted(fitted)]
+    if not fitted:
+        return result
+
+    best_index = min(fitted, key=lambda index: (fitted[index][0], index))
+    result.best_order, result.best_seasonal_order = candidates[best_index]
+    result.best_aic, best_params = fitted[best_index]
+
+    # Rebuild the fitted results from the parameters (no optimization)
+    result.best_model = make_model(y, result.best_order, result.best_seasonal_order).filter(best_params)
+    return result
+
+
+def search(y, seasonal_d, seasonal_periods, method=DEFAULT_METHOD, workers=None, on_fit=None):
+    # Run one search; the stepwise method picks D itself and ignores seasonal_d
+    if method == "grid":
+        return grid_search(y, seasonal_d, seasonal_periods, workers=workers, on_fit=on_fit)
+    if method == "stepwise":
+        from stepwise import stepwise_search
+
+        return stepwise_search(y, seasonal_periods, workers=workers, on_fit=on_fit)
+    raise ValueError(f"Unknown search method: {method!r}")
+
+
+def max_fits(method):
+    # Upper bound on the number of fits of a search, for progress reporting
+    if method == "stepwise":
+        from stepwise import MAX_FITS
+
+        return MAX_FITS
+    return len(P_RANGE) * len(D_RANGE) * len(Q_RANGE) * len(SEASONAL_P_RANGE) * len(SEASONAL_Q_RANGE)
+
+
+def series_fingerprint(y):
+    # Hash of the series index and values
+    digest = hashlib.sha256()
+    digest.update(np.asarray(y.index).tobytes())
+    digest.update(np.asarray(y, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def search_key(y, seasonal_d, seasonal_periods, method=DEFAULT_METHOD):
+    # Series fingerprint plus a hash of the search settings
+    if method == "stepwise":
+        seasonal_d = "auto"
+    spec = f"D={seasonal_d},s={seasonal_periods},method={method},v={SEARCH_VERSION}"
+    return f"{series_fingerprint(y)}-{hashlib.sha256(spec.encode()).hexdigest()[:8]}"
+
+
+def search_entry(result):
+    # Model store entry of a search: the best model's spec and parameters
+    # plus the fit records (see model_store.py)
+    model = None
+    if result.best_model is not None:
+        model = {
+            "order": result.best_order,
+            "seasonal_order": result.best_seasonal_order,
+            "aic": float(result.best_aic),
+            "params": np.asarray(result.best_model.params, dtype=float).tolist(),
+        }
+    fits = [{**vars(record), "aic": None if record.aic is None else float(record.aic)} for record in result.fits]
+    return {"kind": "search", "model": model, "fits": fits, "n_fits": result.n_fits,
+            "timed_out": result.timed_out, "appended": result.appended, "drift": result.drift}
+
+
+def result_from_entry(entry, y):
+    # SearchResult of a stored search; the best model is rebuilt from its
+    # parameters on `y` without fitting
+    result = SearchResult(n_fits=entry["n_fits"], timed_out=entry["timed_out"],
+                          appended=entry.get("appended", 0), drift=entry.get("drift"))
+    for fit in entry["fits"]:
+        fit.update(order=tuple(fit["order"]), seasonal_order=tuple(fit["seasonal_order"]))
+        result.fits.append(FitRecord(**fit))
+    result.aic_table = [(record.order, record.seasonal_order, record.aic) for record in result.fits
+                        if record.aic is not None and np.isfinite(record.aic)]
+    model = entry["model"]
+    if model is not None:
+        result.best_order = tuple(model["order"])
+        result.best_seasonal_order = tuple(model["seasonal_order"])
+        result.best_aic = model["aic"]
+        result.best_model = make_model(y, result.best_order, result.best_seasonal_order).filter(np.array(model["params"]))
+    return result
+
+
+def save_search(key, result):
+    return ModelStore().put(key, search_entry(result))
+
+
+def load_search(key, y):
+    # Stored search result for `key` (rebuilt on `y`), or None
+    entry = ModelStore().get(key)
+    if entry is None or entry.get("kind") != "search":
+        return None
+    return result_from_entry(entry, y)
+
+
+def has_saved_search(key):
+    return key in ModelStore()
+
+
+def find_previous_search(y, seasonal_d, seasonal_periods, method=DEFAULT_METHOD):
+    # (n_new, SearchResult) of the stored search on `y` without its last
+    # n_new observations (the most recent one), or (0, None)
+    for n_new in range(1, min(MAX_NEW_MONTHS, len(y) - 1) + 1):
+        y_previous = y.iloc[:-n_new]
+        previous = load_search(search_key(y_previous, seasonal_d, seasonal_periods, method), y_previous)
+        if previous is not None and previous.best_model is not None:
+            return n_new, previous
+    return 0, None
+
+
+def forecast_drift(results, n_new):
+    # RMS of the standardized one-step-ahead forecast errors of the last n_new
+    # observations; about 1 while the model still describes the series
+    errors = results.standardized_forecasts_error[0, -n_new:]
+    return float(np.sqrt(np.nanmean(errors ** 2)))
+
+
+def update_search(y, seasonal_d, seasonal_periods, method=DEFAULT_METHOD, threshold=DRIFT_THRESHOLD):
+    # Extend the previous search's best model with the new observations of `y`
+    # through the Kalman filter (no re-estimation). None if there is no
+    # previous search or the forecast errors drifted past `threshold`.
+    n_new, previous = find_previous_search(y, seasonal_d, seasonal_periods, method)
+    if previous is None:
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        updated = previous.best_model.append(y.iloc[-n_new:])
+    drift = forecast_drift(updated, n_new)
+    if not drift <= threshold:
+        return None
+
+    return SearchResult(
+        best_order=previous.best_order,
+        best_seasonal_order=previous.best_seasonal_order,
+        best_aic=updated.aic,
+        best_model=updated,
+        aic_table=previous.aic_table,
+        n_fits=previous.n_fits,
+        fits=previous.fits,
+        timed_out=previous.timed_out,
+        appended=previous.appended + n_new,
+        drift=drift,
+    )
+
+
+def default_series(df_jpt):
+    # What the timeseries page fits with its default (full) date range
+    return np.log(df_jpt['Unique Postings'])
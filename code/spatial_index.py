@@ -0,0 +1,117 @@
+# Spatial index of the county centroids, for "within N miles of this county"
+# and "the k nearest counties" queries on the location page.
+#
+# Centroids are stored as 3-D unit vectors in a KD-tree (scipy cKDTree).
+# The straight-line (chord) distance between two unit vectors grows with the
+# great-circle distance, so a radius query is a ball query with the chord of
+# the radius and k-NN is a plain k-NN query, with no distortion near the
+# poles or the antimeridian. Exact haversine distances are then computed,
+# vectorized, for the counties the tree returns. The index is built once per
+# location workbook and shared by all sessions; a query over the ~2,900
+# located counties takes well under a millisecond (benchmarks/bench_spatial_index.py).
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy.spatial import cKDTree
+
+from datasets import get_dataset
+from gazetteer import attach_centroids, fips_codes
+from ingest import source_key
+from state_index import DURATION_COL, POSTINGS_COL, SALARY_COL
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    # Great-circle distance; broadcasts over arrays
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def chord(miles):
+    # Chord length on the unit sphere of a great-circle distance
+    return 2 * np.sin(np.minimum(miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+
+def summarize(rows):
+    # Aggregates of a set of counties (rows of CountyIndex.counties)
+    postings = rows[POSTINGS_COL].to_numpy(dtype=float)
+    salaries = rows[SALARY_COL].to_numpy(dtype=float)
+    return {
+        "Counties": len(rows),
+        "Unique Postings": int(postings.sum()),
+        "Median Salary": float(np.median(salaries)) if len(rows) else float("nan"),
+        # Average of the counties' median salaries, weighted by their postings
+        "Postings-Weighted Salary": float(np.average(salaries, weights=postings)) if postings.sum() else float("nan"),
+        "Median Posting Duration": float(rows[DURATION_COL].median()) if len(rows) else float("nan"),
+    }
+
+
+class CountyIndex:
+    def __init__(self, located_df):
+        self.counties = located_df.assign(FIPS=fips_codes(located_df).to_numpy()).reset_index(drop=True)
+        self.lat = self.counties["Latitude"].to_numpy(dtype=float)
+        self.lon = self.counties["Longitude"].to_numpy(dtype=float)
+        self.tree = cKDTree(unit_vectors(self.lat, self.lon))
+        self.position = pd.Series(np.arange(len(self.counties)), index=self.counties["FIPS"])
+
+    def __contains__(self, fips):
+        return fips in self.position.index
+
+    # --- Positional queries: (positions in self.counties, miles), nearest first ---
+    def _distances(self, origin, found):
+        distances = haversine_miles(self.lat[origin], self.lon[origin], self.lat[found], self.lon[found])
+        order = np.argsort(distances, kind="stable")
+        return found[order], distances[order]
+
+    def within_positions(self, origin, miles):
+        found = np.asarray(self.tree.query_ball_point(self.tree.data[origin], chord(miles)), dtype=int)
+        return self._distances(origin, found)
+
+    def nearest_positions(self, origin, k=10, mask=None):
+        allowed = np.ones(len(self.counties), dtype=bool) if mask is None else np.asarray(mask, dtype=bool).copy()
+        allowed[origin] = False
+        k = min(k, int(allowed.sum()))
+        if k == 0:
+            return self._distances(origin, np.array([], dtype=int))
+        # Ask the tree for more neighbours until k of them pass the mask
+        ask = k + 1
+        while True:
+            _, found = self.tree.query(self.tree.data[origin], k=min(ask, len(self.counties)))
+            found = np.atleast_1d(found)
+            found = found[allowed[found]]
+            if len(found) >= k or ask >= len(self.counties):
+                return self._distances(origin, found[:k])
+            ask *= 4
+
+    # --- Queries by FIPS code, as rows of self.counties with a distance column ---
+    def _rows(self, positions, distances):
+        rows = self.counties.iloc[positions].reset_index(drop=True)
+        rows.insert(0, "Distance (mi)", distances)
+        return rows
+
+    def within(self, fips, miles):
+        # Counties whose centroid is within `miles` of the county's (itself
+        # included), nearest first
+        return self._rows(*self.within_positions(self.position[fips], miles))
+
+    def nearest(self, fips, k=10, mask=None):
+        # The k counties nearest to the county (itself excluded); with a
+        # boolean `mask` over self.counties, only counties where it is True
+        return self._rows(*self.nearest_positions(self.position[fips], k, mask))
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _shared_county_index(key):
+    # One index per process, rebuilt when the location workbook changes
+    return CountyIndex(attach_centroids(get_dataset("locations"), geocode_missing=True)[0])
+
+
+def get_county_index():
+    return _shared_county_index(source_key("locations"))
@@ -0,0 +1,71 @@
+# Per-state partition index for the location dataset.
+#
+# The location frame is sorted by state once at load, and every state gets a
+# precomputed entry: its row slice, the highest/lowest salary rows, a sorted
+# county list and summary metrics. Switching states on the page is then a
+# dictionary lookup instead of a boolean scan over every county.
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from datasets import get_dataset
+from ingest import source_key
+
+SALARY_COL = 'Median Annual Advertised Salary'
+POSTINGS_COL = 'Unique Postings from Jan 2023 - Dec 2023'
+DURATION_COL = 'Median Posting Duration from Jan 2023 - Dec 2023'
+
+
+@dataclass(frozen=True)
+class StateEntry:
+    state: str
+    rows: pd.DataFrame  # the state's counties, in dataset order
+    highest_salary_row: pd.Series
+    lowest_salary_row: pd.Series
+    counties: list  # sorted county names
+    metrics: dict  # summary numbers for the state
+
+
+def build_state_index(df):
+    # Partition the location frame by 'State Name': {state: StateEntry}
+    df = df[df['State Name'].notna()]
+
+    # Stable sort keeps the dataset order of counties within each state
+    df = df.sort_values('State Name', kind='stable').reset_index(drop=True)
+    states = df['State Name'].to_numpy()
+    salaries = df[SALARY_COL].to_numpy()
+
+    # Start of each state's block of rows
+    starts = np.flatnonzero(np.r_[True, states[1:] != states[:-1]])
+    stops = np.r_[starts[1:], len(df)]
+
+    index = {}
+    for start, stop in zip(starts, stops):
+        rows = df.iloc[start:stop]
+        block = salaries[start:stop]
+        index[states[start]] = StateEntry(
+            state=states[start],
+            rows=rows,
+            highest_salary_row=rows.iloc[int(np.argmax(block))],
+            lowest_salary_row=rows.iloc[int(np.argmin(block))],
+            counties=sorted(rows['County Name'].unique()),
+            metrics={
+                "Counties": stop - start,
+                "Unique Postings": int(rows[POSTINGS_COL].sum()),
+                "Median Salary": float(np.median(block)),
+                "Median Posting Duration": float(rows[DURATION_COL].median()),
+            },
+        )
+    return index
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _shared_state_index(key):
+    # One index per process, rebuilt when the location workbook changes
+    return build_state_index(get_dataset("locations"))
+
+
+def get_state_index():
+    return _shared_state_index(source_key("locations"))
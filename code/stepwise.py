@@ -0,0 +1,167 @@
+# Stepwise SARIMA order search (Hyndman-Khandakar style auto-ARIMA).
+#
+# Instead of fitting every order in a fixed grid, the search:
+#   1. picks d and D up front with unit-root tests (KPSS for d, seasonal
+#      strength for D),
+#   2. fits a few seed models,
+#   3. repeatedly fits the untried neighbours of the current best order
+#      (p, q, P, Q one step up or down, alone or together) and moves to the
+#      best one while the AIC keeps improving.
+# Orders that were already fitted, or fall outside the limits below, are
+# skipped. This reaches the grid's AIC with a fraction of the fits, so the
+# order limits can be wider than the grid's 0-2. Neighbour fits start from
+# the current best model's coefficients (see sarima.warm_start_params).
+import time
+import warnings
+
+import numpy as np
+
+import sarima
+
+MAX_P = 5
+MAX_Q = 5
+MAX_SEASONAL_P = 2
+MAX_SEASONAL_Q = 2
+MAX_ORDER = 6  # p + q + P + Q
+MAX_FITS = 60
+
+# forecast::nsdiffs uses the same seasonal-strength threshold
+SEASONAL_STRENGTH_THRESHOLD = 0.64
+
+
+def ndiffs(y, alpha=0.05, max_d=2):
+    # Number of first differences needed for the KPSS test to accept stationarity.
+    # The lag truncation is the short one forecast::ndiffs uses; statsmodels'
+    # "auto" bandwidth accepts stationarity too easily on 4-5 years of months.
+    from statsmodels.tsa.stattools import kpss
+
+    x = np.asarray(y, dtype=float)
+    d = 0
+    while d < max_d and len(x) > 3:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # p-value outside the lookup table
+            _, pvalue, *_ = kpss(x, regression="c", nlags=int(3 * np.sqrt(len(x)) / 13))
+        if pvalue >= alpha:
+            break
+        x = np.diff(x)
+        d += 1
+    return d
+
+
+def nsdiffs(y, seasonal_periods):
+    # 1 if the series has a strong seasonal component (STL seasonal strength)
+    if seasonal_periods <= 1 or len(y) < 2 * seasonal_periods + 1:
+        return 0
+    from statsmodels.tsa.seasonal import STL
+
+    decomposition = STL(np.asarray(y, dtype=float), period=seasonal_periods).fit()
+    remainder = decomposition.resid
+    strength = 1 - np.var(remainder) / np.var(decomposition.seasonal + remainder)
+    return int(strength > SEASONAL_STRENGTH_THRESHOLD)
+
+
+def choose_differencing(y, seasonal_periods):
+    # (d, D): seasonal differencing is decided first, as in auto.arima
+    D = nsdiffs(y, seasonal_periods)
+    x = np.asarray(y, dtype=float)
+    if D:
+        x = x[seasonal_periods:] - x[:-seasonal_periods]
+    return ndiffs(x), D
+
+
+def _valid(p, q, P, Q, seasonal):
+    if min(p, q, P, Q) < 0:
+        return False
+    if p > MAX_P or q > MAX_Q or P > MAX_SEASONAL_P or Q > MAX_SEASONAL_Q:
+        return False
+    if not seasonal and (P or Q):
+        return False
+    return p + q + P + Q <= MAX_ORDER
+
+
+def _seeds(seasonal):
+    if seasonal:
+        return [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+    return [(2, 2, 0, 0), (0, 0, 0, 0), (1, 0, 0, 0), (0, 1, 0, 0)]
+
+
+def _neighbours(p, q, P, Q):
+    steps = [
+        (1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0),
+        (1, 1, 0, 0), (-1, -1, 0, 0),
+        (0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1),
+        (0, 0, 1, 1), (0, 0, -1, -1),
+    ]
+    return [(p + dp, q + dq, P + dP, Q + dQ) for dp, dq, dP, dQ in steps]
+
+
+def stepwise_search(y, seasonal_periods, workers=None, max_fits=MAX_FITS,
+                    time_budget=sarima.SEARCH_TIME_BUDGET, warm_start=True, on_fit=None):
+    # Returns a sarima.SearchResult, like sarima.grid_search (including the
+    # on_fit(record, params) hook)
+    if workers is None:
+        workers = sarima.default_workers()
+    deadline = time.monotonic() + time_budget
+    seasonal = seasonal_periods > 1
+    d, D = choose_differencing(y, seasonal_periods) if seasonal else (ndiffs(y), 0)
+
+    def to_orders(pqPQ):
+        p, q, P, Q = pqPQ
+        return (p, d, q), (P, D, Q, seasonal_periods if seasonal else 0)
+
+    tried = set()
+    fitted = {}  # (p, q, P, Q) -> (aic, params)
+    records = []
+    timed_out = False
+
+    def fit_batch(batch, donor=None):
+        # Fit the untried, valid orders of `batch` (in parallel if workers > 1),
+        # starting from the parameters of the fitted order `donor`
+        nonlocal timed_out
+        batch = [o for o in dict.fromkeys(batch) if o not in tried and _valid(*o, seasonal)]
+        batch = batch[:max(0, max_fits - len(tried))]
+        tried.update(batch)
+        candidates = [to_orders(o) for o in batch]
+        start_params = None
+        if warm_start and donor is not None:
+            start_params = [sarima.warm_start_params(*to_orders(donor), fitted[donor][1], *candidate)
+                            for candidate in candidates]
+        batch_records = {}
+        for index, aic, params, record in sarima._summaries(y, candidates, workers, start_params, deadline):
+            batch_records[index] = record
+            if on_fit is not None:
+                on_fit(record, params)
+            if aic is not None and np.isfinite(aic):
+                fitted[batch[index]] = (aic, params)
+        records.extend(batch_records[index] for index in sorted(batch_records))
+        timed_out = timed_out or any(record.status == "skipped" for record in batch_records.values())
+
+    def best_of(orders):
+        # Lowest AIC among fitted `orders`; ties go to the smaller model
+        orders = [o for o in orders if o in fitted]
+        if not orders:
+            return None
+        return min(orders, key=lambda o: (fitted[o][0], sum(o), o))
+
+    fit_batch(_seeds(seasonal))
+    best = best_of(fitted)
+    while best is not None and len(tried) < max_fits and not timed_out:
+        neighbours = _neighbours(*best)
+        fit_batch(neighbours, donor=best)
+        challenger = best_of(neighbours)
+        if challenger is None or fitted[challenger][0] >= fitted[best][0]:
+            break
+        best = challenger
+
+    result = sarima.SearchResult()
+    result.fits = records
+    result.n_fits = sum(record.status != "skipped" for record in records)
+    result.timed_out = timed_out
+    result.aic_table = [(*to_orders(o), fitted[o][0]) for o in fitted]
+    if best is None:
+        return result
+
+    result.best_order, result.best_seasonal_order = to_orders(best)
+    result.best_aic, best_params = fitted[best]
+    result.best_model = sarima.make_model(y, result.best_order, result.best_seasonal_order).filter(best_params)
+    return result
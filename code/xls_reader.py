@@ -0,0 +1,74 @@
+# Sheet-selective XLS reader built on xlrd's on_demand mode.
+#
+# pd.read_excel decodes every sheet of a workbook and then copies the cells
+# through a row-by-row parser. Here only the requested sheet is decoded,
+# its cells are copied into per-column lists a chunk of rows at a time, and
+# the sheet is unloaded as soon as the columns are built.
+import datetime
+
+import numpy as np
+import pandas as pd
+import xlrd
+
+CHUNK_ROWS = 1024
+
+# Cells whose xlrd value can be used as is
+PLAIN_TYPES = {xlrd.XL_CELL_NUMBER, xlrd.XL_CELL_TEXT}
+
+
+def _cell_value(value, cell_type, datemode):
+    if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+        return None
+    if cell_type == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(value, datemode)
+    if cell_type == xlrd.XL_CELL_BOOLEAN:
+        return bool(value)
+    if cell_type == xlrd.XL_CELL_ERROR:
+        return None
+    return value
+
+
+def _to_series(name, values):
+    # Give a column the type pd.read_excel would: whole numbers become ints,
+    # numeric text ("2188") becomes numbers, anything mixed stays object
+    if all(isinstance(v, float) for v in values):
+        array = np.asarray(values, dtype=np.float64)
+        if np.isfinite(array).all() and (array == np.floor(array)).all():
+            return pd.Series(array.astype(np.int64), name=name)
+        return pd.Series(array, name=name)
+
+    values = [int(v) if isinstance(v, float) and v.is_integer() else v for v in values]
+    series = pd.Series(values, name=name, dtype=object)
+    if any(isinstance(v, (datetime.datetime, bool)) for v in values):
+        return series.infer_objects()
+    try:
+        return pd.to_numeric(series)
+    except (ValueError, TypeError):
+        return series.where(series.notna(), np.nan)
+
+
+def read_sheet(path, sheet_name, skiprows=0, chunk_rows=CHUNK_ROWS):
+    # Read one sheet into a DataFrame; the row after `skiprows` is the header
+    book = xlrd.open_workbook(path, on_demand=True)
+    try:
+        sheet = book.sheet_by_name(sheet_name)
+        header = [str(value) for value in sheet.row_values(skiprows)]
+        columns = [[] for _ in header]
+
+        # Copy cells into column lists a chunk of rows at a time
+        first_row = skiprows + 1
+        for start in range(first_row, sheet.nrows, chunk_rows):
+            stop = min(start + chunk_rows, sheet.nrows)
+            for col, column in enumerate(columns):
+                values = sheet.col_values(col, start, stop)
+                types = sheet.col_types(col, start, stop)
+                if PLAIN_TYPES.issuperset(types):
+                    column.extend(values)
+                else:
+                    column.extend(_cell_value(v, t, book.datemode) for v, t in zip(values, types))
+
+        book.unload_sheet(sheet_name)
+    finally:
+        book.release_resources()
+
+    return pd.DataFrame({name: _to_series(name, values) for name, values in zip(header, columns)})
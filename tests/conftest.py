@@ -0,0 +1,5 @@
+# The app's modules live in code/ and import each other by name
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
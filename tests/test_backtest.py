@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from backtest import MIN_INITIAL, FoldCache, make_folds, run_backtest
+from forecasters import ModelSpec
+
+
+@pytest.mark.parametrize("initial", [-1, 0, MIN_INITIAL - 1])
+def test_make_folds_rejects_a_training_window_too_short_to_fit(initial):
+    with pytest.raises(ValueError, match="too short"):
+        make_folds(24, horizon=3, initial=initial)
+
+
+def test_make_folds_at_the_minimum():
+    assert make_folds(MIN_INITIAL + 2, horizon=1, initial=MIN_INITIAL) == [(0, MIN_INITIAL), (0, MIN_INITIAL + 1)]
+
+
+def test_short_series_raises_value_error(tmp_path):
+    postings = np.array([100.0, 120.0, 110.0])
+    with pytest.raises(ValueError):
+        run_backtest(postings, [ModelSpec("Holt-Winters (ETS)")], horizon=2, initial=1,
+                     workers=1, cache=FoldCache(tmp_path / "folds.sqlite"))
+
+
+def test_backtest_with_the_minimum_training_window(tmp_path):
+    postings = 100 + 10 * np.sin(np.arange(8))
+    summary, folds = run_backtest(postings, [ModelSpec("Holt-Winters (ETS)"), ModelSpec("Drift")], horizon=2,
+                                  initial=MIN_INITIAL, workers=1, cache=FoldCache(tmp_path / "folds.sqlite"))
+    assert set(summary["Model"]) == {"Holt-Winters (ETS)", "Drift"}
+    assert np.isfinite(folds[["MAPE", "sMAPE", "MASE"]].to_numpy()).all()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from batch_forecast import series_panel
+from normalize import STATE_CODES
+from reconcile import incoherence, summing_matrix
+
+
+def test_every_county_series_is_in_a_real_state():
+    ids, values, _ = series_panel()
+    counties = ids[ids["Level"] == "County"]
+    states = ids[ids["Level"] == "State"]
+    assert set(counties["State"]) <= set(STATE_CODES.values())
+    assert set(states["State"]) == set(counties["State"])
+    assert len(states) == 51
+
+    # The state agrees with the FIPS code's state prefix ("[Texas, county not
+    # reported]" is 48999, in TX like every other 48xxx county)
+    prefix_states = counties.groupby(counties["FIPS"] // 1000)["State"].nunique()
+    assert (prefix_states == 1).all()
+
+
+def test_state_series_are_the_sums_of_their_counties():
+    ids, values, _ = series_panel()
+    S, bottom = summing_matrix(ids)
+    assert np.allclose(S @ values[bottom], values)
+    assert incoherence(S, bottom, values) < 1e-6
+
+
+def test_summing_matrix():
+    ids = pd.DataFrame({"Level": ["National", "State", "State", "County", "County", "County"],
+                        "State": ["", "TX", "DE", "TX", "TX", "DE"]})
+    S, bottom = summing_matrix(ids)
+    assert bottom.tolist() == [False, False, False, True, True, True]
+    assert S.toarray().tolist() == [[1, 1, 1], [1, 1, 0], [0, 0, 1], [1, 0, 0], [0, 1, 0], [0, 0, 1]]
@@ -0,0 +1,14 @@
+import pandas as pd
+import pytest
+
+from datasets import get_dataset
+
+
+@pytest.mark.parametrize("copy_on_write", [False, True])
+def test_in_place_edits_do_not_reach_the_shared_frame(copy_on_write):
+    with pd.option_context("mode.copy_on_write", copy_on_write):
+        df = get_dataset("companies")
+        column = df.select_dtypes("number").columns[0]
+        original = df[column].iloc[0]
+        df.iloc[0, df.columns.get_loc(column)] = original + 1
+        assert get_dataset("companies")[column].iloc[0] == original
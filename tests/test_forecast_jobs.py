@@ -0,0 +1,26 @@
+import math
+
+from forecast_jobs import ForecastJob
+from sarima import FitRecord
+
+
+def fit(aic, order=(0, 1, 1)):
+    return FitRecord(order, (0, 1, 1, 12), aic=aic, status="converged")
+
+
+def test_nan_aic_first_does_not_stick_as_best():
+    job = ForecastJob("key", total_fits=4)
+    job._on_fit(fit(math.nan, (2, 1, 2)), "nan params")
+    job._on_fit(fit(-50.0, (1, 1, 0)), "params a")
+    job._on_fit(fit(-70.0, (0, 1, 1)), "params b")
+    record, params = job.best_so_far()
+    assert (record.aic, record.order, params) == (-70.0, (0, 1, 1), "params b")
+    assert job.fits_done == 3
+
+
+def test_fits_without_a_finite_aic_are_never_best():
+    job = ForecastJob("key", total_fits=3)
+    for aic in (None, math.nan, math.inf):
+        job._on_fit(fit(aic), None)
+    assert job.best_so_far() is None
+    assert job.fits_done == 3
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from forecasters import ENGINES
+
+NUMPY_ENGINES = [name for name in ENGINES if name != "SARIMA"]
+
+
+@pytest.mark.parametrize("name", list(ENGINES))
+def test_one_observation_is_rejected(name):
+    with pytest.raises(ValueError, match="at least 2 observations"):
+        ENGINES[name](12).fit(np.array([5.0]))
+
+
+@pytest.mark.parametrize("name", NUMPY_ENGINES)
+def test_one_observation_is_rejected_in_a_batch(name):
+    with pytest.raises(ValueError, match="at least 2 observations"):
+        ENGINES[name](12).fit(np.array([[5.0], [6.0]]))
+
+
+@pytest.mark.parametrize("name", NUMPY_ENGINES)
+def test_two_observations_give_finite_forecasts(name):
+    engine = ENGINES[name](12).fit(np.array([5.0, 6.0]))
+    lower, upper = engine.interval(3)
+    assert np.isfinite(engine.forecast(3)).all()
+    assert np.isfinite(lower).all() and np.isfinite(upper).all()
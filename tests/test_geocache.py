@@ -0,0 +1,29 @@
+import sqlite3
+import time
+
+from geocache import ERROR, ERROR_TTL, FOUND, NOT_FOUND, NOT_FOUND_TTL, GeocodeCache
+
+
+def stored_queries(path):
+    with sqlite3.connect(path) as conn:
+        return {query for query, in conn.execute("SELECT query FROM geocode")}
+
+
+def test_opening_the_cache_drops_expired_negative_entries(tmp_path):
+    path = tmp_path / "geocode.sqlite"
+    now = time.time()
+    cache = GeocodeCache(path)
+    cache.put_many([("old found", (41.8, -72.6), FOUND)], now=now - 10 * NOT_FOUND_TTL)
+    cache.put_many([("old not found", None, NOT_FOUND)], now=now - NOT_FOUND_TTL - 60)
+    cache.put_many([("old error", None, ERROR)], now=now - ERROR_TTL - 60)
+    cache.put_many([("recent not found", None, NOT_FOUND), ("recent error", None, ERROR)], now=now)
+
+    GeocodeCache(path)
+    assert stored_queries(path) == {"old found", "recent not found", "recent error"}
+
+
+def test_prune_returns_the_number_removed(tmp_path):
+    cache = GeocodeCache(tmp_path / "geocode.sqlite")
+    cache.put_many([("a", None, ERROR), ("b", None, NOT_FOUND)], now=time.time() - NOT_FOUND_TTL - 60)
+    assert cache.prune() == 2
+    assert cache.prune() == 0
@@ -0,0 +1,13 @@
+from model_store import ModelStore, _print_entries
+
+
+def test_list_shows_entries_with_and_without_a_model(tmp_path, capsys):
+    store = ModelStore(tmp_path)
+    store.put("fitted", {"kind": "search", "model": {"order": [0, 1, 1], "seasonal_order": [0, 1, 1, 12],
+                                                     "aic": -70.12345}})
+    store.put("no-model", {"kind": "search", "model": None})
+    _print_entries(store)
+    out = capsys.readouterr().out
+    assert "(0, 1, 1)(0, 1, 1, 12)" in out and "-70.123" in out
+    assert "no-model" in out
+    assert "2 entries" in out
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from normalize import STATE_CODES, parse_state, state_of
+
+
+def test_state_of_a_county():
+    assert state_of("Travis County, TX") == "TX"
+    assert state_of("Capitol Planning Region, CT") == "CT"
+
+
+def test_state_of_a_county_not_reported():
+    # Regression: these used to parse as the state "COUNTY NOT REPORTED]"
+    assert state_of("[Texas, county not reported]") == "TX"
+    assert state_of("[District of Columbia, county not reported]") == "DC"
+
+
+def test_state_of_an_unknown_name():
+    assert state_of("[Atlantis, county not reported]") is None
+    assert state_of("Nowhere") is None
+
+
+def test_parse_state_is_a_categorical_aligned_with_the_counties():
+    counties = pd.Series(["[Texas, county not reported]", "Travis County, TX", "Kent County, DE", None,
+                          "[Delaware, county not reported]"], index=[10, 11, 12, 13, 14])
+    states = parse_state(counties)
+    assert isinstance(states.dtype, pd.CategoricalDtype)
+    assert states.index.equals(counties.index)
+    assert states.tolist()[:3] == ["TX", "TX", "DE"] and pd.isna(states.iloc[3]) and states.iloc[4] == "DE"
+    assert set(states.cat.categories) <= set(STATE_CODES.values())